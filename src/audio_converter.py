@@ -1,13 +1,58 @@
 """Audio format conversion utilities for Fallout audio files."""
 
 import logging
+import os
 import shutil
 import subprocess
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Pipe buffer for external tools so long conversions never stall on a full pipe
+PIPE_BUFFER_SIZE = 1 << 20
+
+# Number of trailing stderr lines kept for error reporting
+STDERR_TAIL_LINES = 200
+
+# Tools found so far, keyed by (tools_dir, executable, command). Misses are
+# not cached, so a tool installed while the process runs is picked up.
+_found_tools: dict[tuple[Path, str, str], Path] = {}
+
+
+def _find_tool(tools_dir: Path, executable: str, command: str) -> Optional[Path]:
+    """
+    Locate an external tool, checking the tools directory before PATH.
+
+    Successful lookups are cached per process so converters sharing a
+    tools directory probe once.
+
+    Args:
+        tools_dir: Directory containing external tools
+        executable: File name to look for in tools_dir (e.g. "ffmpeg.exe")
+        command: Command name to look up on PATH (e.g. "ffmpeg")
+
+    Returns:
+        Path to the tool, or None if not found
+    """
+    key = (tools_dir, executable, command)
+    cached = _found_tools.get(key)
+    if cached is not None:
+        return cached
+
+    tool_path = tools_dir / executable
+    if not tool_path.exists():
+        found = shutil.which(command)
+        if not found:
+            return None
+        tool_path = Path(found)
+
+    _found_tools[key] = tool_path
+    return tool_path
+
 
 class AudioConverter:
     """Convert audio files between formats for Fallout modding."""
@@ -15,47 +60,42 @@ class AudioConverter:
     SUPPORTED_INPUT_FORMATS = [".wav", ".xwm", ".mp3", ".ogg", ".fuz"]
     SUPPORTED_OUTPUT_FORMATS = [".wav", ".xwm", ".fuz"]
 
-    def __init__(self, tools_dir: Optional[Path] = None) -> None:
+    # Files decoded per ffmpeg process in batch WAV conversion
+    FFMPEG_BATCH_SIZE = 64
+
+    # Command line budget per ffmpeg process (Windows limit is 32767 chars)
+    FFMPEG_MAX_COMMAND_LENGTH = 30000
+
+    # Approximate per-file option overhead in a batched ffmpeg command
+    FFMPEG_ARGS_PER_FILE_LENGTH = 100
+
+    def __init__(
+        self,
+        tools_dir: Optional[Path] = None,
+        ffmpeg_threads: int = 1,
+    ) -> None:
         """
         Initialize the audio converter.
 
         Args:
             tools_dir: Directory containing external tools (xWMAEncode, ffmpeg, etc.)
+            ffmpeg_threads: Threads per ffmpeg process. The default of 1 suits
+                            convert_batch, which already runs one ffmpeg per core;
+                            raise it when converting single large files.
         """
         self.logger = logging.getLogger(__name__)
         self.tools_dir = tools_dir or Path("tools")
-        self._xwma_encoder: Optional[Path] = None
-        self._ffmpeg: Optional[Path] = None
+        self.ffmpeg_threads = ffmpeg_threads
 
     @property
     def xwma_encoder(self) -> Optional[Path]:
         """Get path to xWMAEncode executable."""
-        if self._xwma_encoder is None:
-            # Check tools directory first
-            encoder_path = self.tools_dir / "xWMAEncode.exe"
-            if encoder_path.exists():
-                self._xwma_encoder = encoder_path
-            else:
-                # Check if in PATH
-                found = shutil.which("xWMAEncode")
-                if found:
-                    self._xwma_encoder = Path(found)
-        return self._xwma_encoder
+        return _find_tool(self.tools_dir, "xWMAEncode.exe", "xWMAEncode")
 
     @property
     def ffmpeg(self) -> Optional[Path]:
         """Get path to ffmpeg executable."""
-        if self._ffmpeg is None:
-            # Check tools directory first
-            ffmpeg_path = self.tools_dir / "ffmpeg.exe"
-            if ffmpeg_path.exists():
-                self._ffmpeg = ffmpeg_path
-            else:
-                # Check if in PATH
-                found = shutil.which("ffmpeg")
-                if found:
-                    self._ffmpeg = Path(found)
-        return self._ffmpeg
+        return _find_tool(self.tools_dir, "ffmpeg.exe", "ffmpeg")
 
     def convert_to_xwma(
         self,
@@ -82,25 +122,29 @@ class AudioConverter:
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        self.logger.debug(f"Converting {input_path} to xWMA")
+        self.logger.debug("Converting %s to xWMA", input_path)
 
-        # First convert to WAV if necessary
-        if input_path.suffix.lower() != ".wav":
-            wav_path = self._convert_to_wav(input_path)
-        else:
-            wav_path = input_path
-
-        # Then convert WAV to xWMA
-        if self.xwma_encoder:
-            self._xwma_encode(wav_path, output_path, bitrate)
-        else:
+        # Check for the encoder before spending time decoding to WAV
+        if not self.xwma_encoder:
             raise RuntimeError(
                 "xWMAEncode not found. Please place xWMAEncode.exe in the tools directory."
             )
 
-        # Clean up temporary WAV if we created one
-        if wav_path != input_path and wav_path.exists():
-            wav_path.unlink()
+        # xWMAEncode reads WAV input directly
+        if input_path.suffix.lower() == ".wav":
+            self._xwma_encode(input_path, output_path, bitrate)
+        else:
+            # xWMAEncode only reads seekable WAV files (no pipes), so decode to
+            # a unique temp file rather than next to the input, where it could
+            # overwrite a real .wav or collide with a parallel conversion
+            fd, temp_name = tempfile.mkstemp(suffix=".wav", prefix="fo3audio_")
+            os.close(fd)
+            wav_path = Path(temp_name)
+            try:
+                self._convert_to_wav(input_path, wav_path)
+                self._xwma_encode(wav_path, output_path, bitrate)
+            finally:
+                wav_path.unlink(missing_ok=True)
 
         self.logger.info(f"Converted to xWMA: {output_path}")
         return output_path
@@ -141,9 +185,13 @@ class AudioConverter:
                 "ffmpeg not found. Please install ffmpeg or place it in the tools directory."
             )
 
+        threads = str(self.ffmpeg_threads)
         cmd = [
             str(self.ffmpeg),
+            "-threads", threads,
             "-i", str(input_path),
+            "-filter_threads", threads,
+            "-threads", threads,
             "-acodec", "pcm_s16le",
             "-ar", "44100",
             "-ac", "1",
@@ -151,20 +199,67 @@ class AudioConverter:
             str(output_path),
         ]
 
-        self.logger.debug(f"Running ffmpeg: {' '.join(cmd)}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Running ffmpeg: %s", " ".join(cmd))
 
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-        )
+        returncode, stderr = self._run_tool(cmd)
 
-        if result.returncode != 0:
-            self.logger.error(f"ffmpeg error: {result.stderr}")
-            raise RuntimeError(f"ffmpeg conversion failed: {result.stderr}")
+        if returncode != 0:
+            self.logger.error(f"ffmpeg error: {stderr}")
+            raise RuntimeError(f"ffmpeg conversion failed: {stderr}")
 
         return output_path
 
+    def _convert_many_to_wav(
+        self,
+        input_paths: list[Path],
+        output_paths: list[Path],
+    ) -> list[Path]:
+        """
+        Convert several files to WAV with a single ffmpeg process.
+
+        Amortizes ffmpeg start-up cost, which dominates for short voice lines.
+        If any input fails the whole invocation fails.
+
+        Args:
+            input_paths: Input audio files
+            output_paths: Output WAV paths, one per input
+
+        Returns:
+            List of converted file paths
+        """
+        if not self.ffmpeg:
+            raise RuntimeError(
+                "ffmpeg not found. Please install ffmpeg or place it in the tools directory."
+            )
+
+        threads = str(self.ffmpeg_threads)
+        cmd = [str(self.ffmpeg)]
+        for input_path in input_paths:
+            cmd += ["-threads", threads, "-i", str(input_path)]
+
+        cmd += ["-filter_threads", threads]
+        for index, output_path in enumerate(output_paths):
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            cmd += [
+                "-map", f"{index}:a",
+                "-threads", threads,
+                "-acodec", "pcm_s16le",
+                "-ar", "44100",
+                "-ac", "1",
+                "-y",
+                str(output_path),
+            ]
+
+        self.logger.debug("Running ffmpeg on %d files", len(input_paths))
+
+        returncode, stderr = self._run_tool(cmd)
+
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg batch conversion failed: {stderr}")
+
+        return list(output_paths)
+
     def _xwma_encode(
         self,
         input_path: Path,
@@ -182,60 +277,195 @@ class AudioConverter:
             "/b", str(bitrate),
         ]
 
-        self.logger.debug(f"Running xWMAEncode: {' '.join(cmd)}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Running xWMAEncode: %s", " ".join(cmd))
+
+        returncode, stderr = self._run_tool(cmd)
 
-        result = subprocess.run(
+        if returncode != 0:
+            self.logger.error(f"xWMAEncode error: {stderr}")
+            raise RuntimeError(f"xWMAEncode conversion failed: {stderr}")
+
+    def _run_tool(self, cmd: list[str]) -> tuple[int, str]:
+        """
+        Run an external tool, discarding stdout and keeping the tail of stderr.
+
+        Args:
+            cmd: Command line to execute
+
+        Returns:
+            Tuple of (return_code, stderr_tail)
+        """
+        with subprocess.Popen(
             cmd,
-            capture_output=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            bufsize=PIPE_BUFFER_SIZE,
             text=True,
-        )
+            errors="replace",
+        ) as process:
+            stderr_tail = deque(process.stderr, maxlen=STDERR_TAIL_LINES)
+            returncode = process.wait()
 
-        if result.returncode != 0:
-            self.logger.error(f"xWMAEncode error: {result.stderr}")
-            raise RuntimeError(f"xWMAEncode conversion failed: {result.stderr}")
+        return returncode, "".join(stderr_tail)
 
     def convert_batch(
         self,
         input_files: list[Path],
         output_dir: Path,
         target_format: str = ".xwm",
+        max_workers: Optional[int] = None,
     ) -> list[Path]:
         """
         Convert multiple audio files to the target format.
 
+        Conversions are dispatched to a thread pool and run concurrently. The
+        threads only launch and reap native ffmpeg/xWMAEncode processes and
+        release the GIL while waiting, so no Python worker processes (and no
+        Windows spawn cost) are needed. WAV targets are converted in groups of
+        up to FFMPEG_BATCH_SIZE files per ffmpeg process, bounded by the
+        command line length; xWMA targets are converted one file at a time
+        because xWMAEncode only accepts a single input.
+
         Args:
             input_files: List of input file paths
             output_dir: Directory for output files
             target_format: Target format extension (default: .xwm)
+            max_workers: Maximum concurrent conversions (default: CPU count)
 
         Returns:
             List of converted file paths
         """
         output_dir.mkdir(parents=True, exist_ok=True)
-        converted_files: list[Path] = []
 
-        for input_file in input_files:
-            try:
-                output_path = output_dir / input_file.with_suffix(target_format).name
+        if target_format not in (".xwm", ".wav"):
+            self.logger.warning(f"Unsupported target format: {target_format}")
+            return []
+
+        # Outputs are flat, and FO3 reuses voice file names in every voice
+        # type folder, so several inputs can map to one output. Only the
+        # last of them is converted: that leaves the same file as converting
+        # in order did, and no two conversions write the same path.
+        last_input: dict[str, int] = {}
+        for index, input_file in enumerate(input_files):
+            output_name = input_file.with_suffix(target_format).name
+            last_input[os.path.normcase(output_name)] = index
+        selected = sorted(last_input.values())
+        if len(selected) < len(input_files):
+            self.logger.warning(
+                f"Skipping {len(input_files) - len(selected)} files whose output "
+                f"name is reused by a later file"
+            )
 
-                if target_format == ".xwm":
-                    converted = self.convert_to_xwma(input_file, output_path)
-                elif target_format == ".wav":
-                    converted = self.convert_to_wav(input_file, output_path)
-                else:
-                    self.logger.warning(f"Unsupported target format: {target_format}")
-                    continue
+        input_files = [input_files[index] for index in selected]
+        output_paths = [
+            output_dir / input_file.with_suffix(target_format).name
+            for input_file in input_files
+        ]
 
-                converted_files.append(converted)
+        if target_format == ".wav":
+            groups = self._group_for_ffmpeg(input_files, output_paths)
+        else:
+            groups = [[index] for index in range(len(input_files))]
 
-            except Exception as e:
-                self.logger.error(f"Failed to convert {input_file}: {e}")
+        converted_files: list[Path] = []
+
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            futures = [
+                executor.submit(
+                    self._convert_group,
+                    [input_files[index] for index in group],
+                    [output_paths[index] for index in group],
+                    target_format,
+                )
+                for group in groups
+            ]
+
+            # Collect in submission order so the output follows the input order
+            for future in futures:
+                converted_files.extend(
+                    path for path in future.result() if path is not None
+                )
 
         self.logger.info(
             f"Converted {len(converted_files)}/{len(input_files)} files"
         )
         return converted_files
 
+    def _group_for_ffmpeg(
+        self,
+        input_paths: list[Path],
+        output_paths: list[Path],
+    ) -> list[list[int]]:
+        """
+        Split files into groups that fit in one ffmpeg command line.
+
+        Groups hold at most FFMPEG_BATCH_SIZE files and stay within
+        FFMPEG_MAX_COMMAND_LENGTH, since deep FO3 voice paths can otherwise
+        overflow the Windows command line limit.
+
+        Returns:
+            Lists of indices into input_paths
+        """
+        groups: list[list[int]] = []
+        group: list[int] = []
+        length = 0
+
+        for index, (input_path, output_path) in enumerate(zip(input_paths, output_paths)):
+            file_length = (
+                len(str(input_path))
+                + len(str(output_path))
+                + self.FFMPEG_ARGS_PER_FILE_LENGTH
+            )
+            if group and (
+                len(group) >= self.FFMPEG_BATCH_SIZE
+                or length + file_length > self.FFMPEG_MAX_COMMAND_LENGTH
+            ):
+                groups.append(group)
+                group, length = [], 0
+
+            group.append(index)
+            length += file_length
+
+        if group:
+            groups.append(group)
+
+        return groups
+
+    def _convert_group(
+        self,
+        input_paths: list[Path],
+        output_paths: list[Path],
+        target_format: str,
+    ) -> list[Optional[Path]]:
+        """
+        Convert a group of files as part of a batch.
+
+        Multi-file groups are tried as one ffmpeg run first; on failure each
+        file is retried individually so one bad file does not sink the group.
+
+        Returns:
+            Converted path for each input, or None where conversion failed
+        """
+        if len(input_paths) > 1:
+            try:
+                return list(self._convert_many_to_wav(input_paths, output_paths))
+            except Exception as e:
+                self.logger.debug("Batch conversion failed, retrying per file: %s", e)
+
+        converted: list[Optional[Path]] = []
+        for input_path, output_path in zip(input_paths, output_paths):
+            try:
+                if target_format == ".xwm":
+                    converted.append(self.convert_to_xwma(input_path, output_path))
+                else:
+                    converted.append(self.convert_to_wav(input_path, output_path))
+            except Exception as e:
+                self.logger.error(f"Failed to convert {input_path}: {e}")
+                converted.append(None)
+
+        return converted
+
     def validate_audio(self, file_path: Path) -> bool:
         """
         Validate an audio file.
@@ -1,16 +1,75 @@
 """BA2 archive builder for Fallout 4."""
 
+import itertools
 import logging
+import mmap
+import os
+import shutil
 import struct
 import subprocess
+import sys
+import threading
 import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import IntEnum
+from functools import lru_cache
 from pathlib import Path
-from typing import BinaryIO, Callable, Optional
+from typing import BinaryIO, Callable, Iterator, Optional
 
 logger = logging.getLogger(__name__)
 
+# Pipe buffer for Archive2.exe so large builds never stall on a full pipe
+# (same size as audio_converter.PIPE_BUFFER_SIZE)
+PIPE_BUFFER_SIZE = 1 << 20
+
+# Number of trailing output lines kept for error reporting
+OUTPUT_TAIL_LINES = 200
+
+# Chunk size for copying file data into archives
+COPY_BUFFER_SIZE = 1 << 20
+
+# Header: magic, version, archive_type, file_count, name_table_offset (24 bytes)
+_BA2_HEADER = struct.Struct("<4sIIIQ")
+
+# GNRL file record: name_hash, ext, dir_hash, flags, offset,
+# packed_size, unpacked_size, padding (36 bytes)
+_GNRL_RECORD = struct.Struct("<I4sIIQIII")
+
+# os.sendfile only accepts regular-file output on Linux
+_USE_SENDFILE = sys.platform.startswith("linux")
+
+
+def _compress_file(source: Path, size: int) -> Optional[bytes]:
+    """
+    zlib-compress a file for a BA2 archive.
+    
+    Returns:
+        Compressed data, or None if compression does not save space
+    """
+    if size == 0:
+        return None
+    
+    with open(source, "rb") as src, mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        compressed = zlib.compress(data, 6)
+    
+    # Only use compression if it actually saves space
+    return compressed if len(compressed) < size else None
+
+
+@lru_cache(maxsize=4096)
+def _fnv1a(s: str) -> int:
+    """
+    FNV-1a hash of a normalized archive path component.
+    
+    Cached because every file in a folder hashes the same directory name.
+    """
+    hash_value = 0x811c9dc5
+    for char in s.encode("utf-8"):
+        hash_value = ((hash_value ^ char) * 0x01000193) & 0xFFFFFFFF
+    return hash_value
+
 
 class BA2Type(IntEnum):
     """BA2 archive types."""
@@ -26,7 +85,7 @@ class BA2CompressionType(IntEnum):
     LZ4 = 2
 
 
-@dataclass
+@dataclass(slots=True)
 class BA2FileRecord:
     """Record for a file in a BA2 archive."""
     
@@ -37,7 +96,7 @@ class BA2FileRecord:
     offset: int
     packed_size: int
     unpacked_size: int
-    data: bytes
+    source: Optional[Path]  # File on disk, read when the archive is written
     path: str  # Full relative path
 
 
@@ -79,33 +138,9 @@ class BA2Builder:
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        with open(file_path, "rb") as f:
-            data = f.read()
-        
-        # Normalize path separators
-        archive_path = archive_path.replace("/", "\\")
-        
-        # Calculate hashes
-        name_hash = self._hash_string(Path(archive_path).stem.lower())
-        dir_hash = self._hash_string(str(Path(archive_path).parent).lower())
-        
-        # Get extension (padded to 4 bytes)
-        ext = Path(archive_path).suffix[1:].lower().encode("ascii")[:4].ljust(4, b"\x00")
-        
-        record = BA2FileRecord(
-            name_hash=name_hash,
-            ext=ext,
-            dir_hash=dir_hash,
-            flags=0,
-            offset=0,  # Set during build
-            packed_size=0,  # Set during build
-            unpacked_size=len(data),
-            data=data,
-            path=archive_path,
-        )
-        
+        record = self._make_record(file_path, archive_path, file_path.stat().st_size)
         self.files.append(record)
-        self.logger.debug(f"Added file: {archive_path}")
+        self.logger.debug("Added file: %s", record.path)
     
     def add_directory(self, source_dir: Path, archive_base: str = "") -> int:
         """
@@ -118,17 +153,99 @@ class BA2Builder:
         Returns:
             Number of files added
         """
+        base = archive_base.replace("/", "\\").strip("\\")
+        
         count = 0
-        for file_path in source_dir.rglob("*"):
-            if file_path.is_file():
-                relative = file_path.relative_to(source_dir)
-                archive_path = str(Path(archive_base) / relative) if archive_base else str(relative)
-                self.add_file(file_path, archive_path)
-                count += 1
+        for relative_dir, files in self._walk_directories(str(source_dir), ""):
+            archive_dir = "\\".join(part for part in (base, relative_dir) if part)
+            # Every file in a folder shares its directory hash
+            dir_hash = self._hash_string((archive_dir or ".").lower())
+            
+            for file_path, name, size in files:
+                archive_path = f"{archive_dir}\\{name}" if archive_dir else name
+                self.files.append(
+                    self._make_record(Path(file_path), archive_path, size, dir_hash)
+                )
+            count += len(files)
         
         self.logger.info(f"Added {count} files from {source_dir}")
         return count
     
+    def _walk_directories(
+        self,
+        directory: str,
+        relative: str,
+    ) -> Iterator[tuple[str, list[tuple[str, str, int]]]]:
+        """
+        Recursively list files with a single scandir pass per directory.
+        
+        DirEntry caches the type information from the directory listing, so
+        no per-entry stat is needed to tell files from folders. Symlinked
+        folders are not followed (like os.walk's followlinks=False), which
+        also rules out cycles.
+        
+        Yields:
+            Tuples of (relative_dir, [(file_path, file_name, size), ...]),
+            one per directory, depth-first
+        """
+        files: list[tuple[str, str, int]] = []
+        subdirs: list[tuple[str, str]] = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    files.append((entry.path, entry.name, entry.stat().st_size))
+                elif entry.is_dir(follow_symlinks=False):
+                    subdirs.append(
+                        (entry.path, f"{relative}\\{entry.name}" if relative else entry.name)
+                    )
+        
+        yield relative, files
+        
+        for subdir, subdir_relative in subdirs:
+            yield from self._walk_directories(subdir, subdir_relative)
+    
+    def _make_record(
+        self,
+        source: Path,
+        archive_path: str,
+        size: int,
+        dir_hash: Optional[int] = None,
+    ) -> BA2FileRecord:
+        """
+        Create a file record, splitting the archive path only once.
+        
+        Args:
+            source: Path to the file on disk
+            archive_path: Path within the archive
+            size: File size in bytes
+            dir_hash: Precomputed directory hash, if already known
+        """
+        # Normalize path separators
+        archive_path = archive_path.replace("/", "\\")
+        
+        directory, _, file_name = archive_path.rpartition("\\")
+        stem, dot, suffix = file_name.rpartition(".")
+        if not dot or not stem:
+            # No extension, or a dot-file such as ".hidden"
+            stem, suffix = file_name, ""
+        
+        if dir_hash is None:
+            # Top-level files hash "." like Path(...).parent does
+            dir_hash = self._hash_string((directory or ".").lower())
+        
+        return BA2FileRecord(
+            name_hash=self._hash_string(stem.lower()),
+            dir_hash=dir_hash,
+            # Get extension (padded to 4 bytes)
+            ext=suffix.lower().encode("ascii")[:4].ljust(4, b"\x00"),
+            flags=0,
+            offset=0,  # Set during build
+            packed_size=0,  # Set during build
+            unpacked_size=size,
+            source=source,
+            path=archive_path,
+        )
+    
     def build(self, output_path: Path) -> Path:
         """
         Build the BA2 archive.
@@ -153,68 +270,129 @@ class BA2Builder:
         return output_path
     
     def _write_archive(self, f: BinaryIO) -> None:
-        """Write the BA2 archive to a file."""
+        """
+        Write the BA2 archive to a file.
+        
+        File data is streamed from disk one file at a time, so memory use does
+        not grow with the archive size. Records are sorted by
+        (dir_hash, name_hash) first. When compression is enabled, files are
+        compressed in parallel a bounded window ahead of the writer. The
+        header and file records are written last, once every offset and
+        packed size is known.
+        """
+        # Order records by hash so readers can binary-search them; file data
+        # is written in the same order below
+        self.files.sort(key=lambda record: (record.dir_hash, record.name_hash))
+        
         file_count = len(self.files)
         
         # Calculate header size
-        header_size = 24  # Magic(4) + Version(4) + Type(4) + FileCount(4) + NameTableOffset(8)
-        file_records_size = file_count * 36  # Each GNRL record is 36 bytes
+        header_size = _BA2_HEADER.size  # Magic(4) + Version(4) + Type(4) + FileCount(4) + NameTableOffset(8)
+        file_records_size = file_count * _GNRL_RECORD.size  # 36 bytes per GNRL record
         
-        # Start of file data
-        data_offset = header_size + file_records_size
+        # Write file data after the space reserved for header and records
+        f.seek(header_size + file_records_size)
         
-        # Prepare file data and update records
-        current_offset = data_offset
-        file_data_blocks: list[bytes] = []
+        if self.compress:
+            compressed_blocks = self._compress_files()
+        else:
+            compressed_blocks = itertools.repeat(None)
         
-        for record in self.files:
-            if self.compress:
-                compressed = zlib.compress(record.data, level=6)
-                # Only use compression if it actually saves space
-                if len(compressed) < len(record.data):
-                    record.packed_size = len(compressed)
-                    file_data_blocks.append(compressed)
-                else:
-                    record.packed_size = 0  # 0 means uncompressed
-                    file_data_blocks.append(record.data)
-            else:
-                record.packed_size = 0
-                file_data_blocks.append(record.data)
+        for record, compressed in zip(self.files, compressed_blocks):
+            record.offset = f.tell()
             
-            record.offset = current_offset
-            current_offset += len(file_data_blocks[-1])
+            if compressed is not None:
+                record.packed_size = len(compressed)
+                f.write(compressed)
+            else:
+                record.packed_size = 0  # 0 means uncompressed
+                if record.unpacked_size:
+                    self._copy_file(record.source, f, record.unpacked_size)
         
         # Name table offset is after all file data
-        name_table_offset = current_offset
+        name_table_offset = f.tell()
         
-        # Write header
-        f.write(BA2Header.MAGIC)
-        f.write(struct.pack("<I", BA2Header.VERSION))
-        f.write(struct.pack("<I", BA2Type.GNRL))
-        f.write(struct.pack("<I", file_count))
-        f.write(struct.pack("<Q", name_table_offset))
-        
-        # Write file records
-        for record in self.files:
-            f.write(struct.pack("<I", record.name_hash))
-            f.write(record.ext)
-            f.write(struct.pack("<I", record.dir_hash))
-            f.write(struct.pack("<I", record.flags))
-            f.write(struct.pack("<Q", record.offset))
-            f.write(struct.pack("<I", record.packed_size))
-            f.write(struct.pack("<I", record.unpacked_size))
-            f.write(struct.pack("<I", 0xBAADF00D))  # Padding/alignment
-        
-        # Write file data
-        for data_block in file_data_blocks:
-            f.write(data_block)
-        
-        # Write name table
+        # Write name table of length-prefixed strings in one block
+        name_table: list[bytes] = []
         for record in self.files:
-            # Write length-prefixed string
             name_bytes = record.path.encode("utf-8")
-            f.write(struct.pack("<H", len(name_bytes)))
-            f.write(name_bytes)
+            name_table.append(len(name_bytes).to_bytes(2, "little"))
+            name_table.append(name_bytes)
+        f.write(b"".join(name_table))
+        
+        # Write header
+        f.seek(0)
+        f.write(_BA2_HEADER.pack(
+            BA2Header.MAGIC,
+            BA2Header.VERSION,
+            BA2Type.GNRL,
+            file_count,
+            name_table_offset,
+        ))
+        
+        # Write file records as a single block
+        records = bytearray(file_records_size)
+        for index, record in enumerate(self.files):
+            _GNRL_RECORD.pack_into(
+                records,
+                index * _GNRL_RECORD.size,
+                record.name_hash,
+                record.ext,
+                record.dir_hash,
+                record.flags,
+                record.offset,
+                record.packed_size,
+                record.unpacked_size,
+                0xBAADF00D,  # Padding/alignment
+            )
+        f.write(records)
+    
+    def _copy_file(self, source: Path, f: BinaryIO, size: int) -> None:
+        """
+        Copy a file into the archive without materializing it in Python.
+        
+        Uses os.sendfile on Linux and a chunked copy elsewhere.
+        """
+        with open(source, "rb") as src:
+            if not _USE_SENDFILE:
+                shutil.copyfileobj(src, f, COPY_BUFFER_SIZE)
+                return
+            
+            f.flush()
+            sent = 0
+            while sent < size:
+                count = os.sendfile(f.fileno(), src.fileno(), sent, size - sent)
+                if count == 0:
+                    raise OSError(f"Unexpected end of file: {source}")
+                sent += count
+            
+            # sendfile advanced the descriptor; resync the buffered writer
+            f.seek(0, os.SEEK_END)
+    
+    def _compress_files(self) -> Iterator[Optional[bytes]]:
+        """
+        Compress every record's file in a thread pool.
+        
+        zlib releases the GIL while compressing, so threads scale across
+        cores. At most a few files per worker are held in memory at once.
+        
+        Yields:
+            Compressed data in record order, or None where compression does
+            not save space
+        """
+        workers = os.cpu_count() or 1
+        window = workers * 4
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending: deque[Future[Optional[bytes]]] = deque()
+            
+            for record in self.files:
+                pending.append(executor.submit(_compress_file, record.source, record.unpacked_size))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            
+            while pending:
+                yield pending.popleft().result()
     
     def _hash_string(self, s: str) -> int:
         """
@@ -225,16 +403,8 @@ class BA2Builder:
         if not s:
             return 0
         
-        # Convert to lowercase and normalize
-        s = s.lower().replace("/", "\\")
-        
-        # Simple hash algorithm (FNV-1a variant)
-        hash_value = 0x811c9dc5
-        for char in s.encode("utf-8"):
-            hash_value ^= char
-            hash_value = (hash_value * 0x01000193) & 0xFFFFFFFF
-        
-        return hash_value
+        # Convert to lowercase and normalize, then apply FNV-1a
+        return _fnv1a(s.lower().replace("/", "\\"))
     
     def clear(self) -> None:
         """Clear all files from the builder."""
@@ -260,32 +430,23 @@ class BA2Reader:
         """Parse the BA2 archive."""
         with open(self.ba2_path, "rb") as f:
             # Read header
-            magic = f.read(4)
-            if magic != BA2Header.MAGIC:
+            header = f.read(_BA2_HEADER.size)
+            if len(header) < _BA2_HEADER.size or header[:4] != BA2Header.MAGIC:
                 raise ValueError(f"Invalid BA2 file: {self.ba2_path}")
             
-            version = struct.unpack("<I", f.read(4))[0]
-            archive_type = BA2Type(struct.unpack("<I", f.read(4))[0])
-            file_count = struct.unpack("<I", f.read(4))[0]
-            name_table_offset = struct.unpack("<Q", f.read(8))[0]
+            _magic, version, archive_type, file_count, name_table_offset = (
+                _BA2_HEADER.unpack(header)
+            )
+            archive_type = BA2Type(archive_type)
             
             self.logger.debug(
                 f"BA2: version={version}, type={archive_type}, files={file_count}"
             )
             
-            # Read file records
-            records: list[BA2FileRecord] = []
-            for _ in range(file_count):
-                name_hash = struct.unpack("<I", f.read(4))[0]
-                ext = f.read(4)
-                dir_hash = struct.unpack("<I", f.read(4))[0]
-                flags = struct.unpack("<I", f.read(4))[0]
-                offset = struct.unpack("<Q", f.read(8))[0]
-                packed_size = struct.unpack("<I", f.read(4))[0]
-                unpacked_size = struct.unpack("<I", f.read(4))[0]
-                _padding = f.read(4)  # Padding
-                
-                records.append(BA2FileRecord(
+            # Read all file records in one block
+            record_data = f.read(file_count * _GNRL_RECORD.size)
+            records = [
+                BA2FileRecord(
                     name_hash=name_hash,
                     ext=ext,
                     dir_hash=dir_hash,
@@ -293,15 +454,23 @@ class BA2Reader:
                     offset=offset,
                     packed_size=packed_size,
                     unpacked_size=unpacked_size,
-                    data=b"",
+                    source=None,
                     path="",
-                ))
+                )
+                for (
+                    name_hash, ext, dir_hash, flags, offset, packed_size, unpacked_size, _padding
+                ) in _GNRL_RECORD.iter_unpack(record_data)
+            ]
             
-            # Read name table
+            # Read the whole name table and split the length-prefixed strings
             f.seek(name_table_offset)
+            name_table = f.read()
+            position = 0
             for record in records:
-                name_len = struct.unpack("<H", f.read(2))[0]
-                record.path = f.read(name_len).decode("utf-8")
+                name_len = int.from_bytes(name_table[position:position + 2], "little")
+                position += 2
+                record.path = name_table[position:position + name_len].decode("utf-8")
+                position += name_len
                 self.files[record.path.lower()] = record
     
     def extract(self, output_dir: Path, filter_pattern: Optional[str] = None) -> int:
@@ -316,33 +485,52 @@ class BA2Reader:
             Number of files extracted
         """
         output_dir.mkdir(parents=True, exist_ok=True)
-        extracted = 0
         
-        with open(self.ba2_path, "rb") as f:
-            for path, record in self.files.items():
-                if filter_pattern:
-                    if not Path(path).match(filter_pattern):
-                        continue
-                
-                # Read file data
-                f.seek(record.offset)
-                if record.packed_size > 0:
-                    compressed_data = f.read(record.packed_size)
-                    data = zlib.decompress(compressed_data)
-                else:
-                    data = f.read(record.unpacked_size)
-                
-                # Write to output
-                output_path = output_dir / record.path
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(output_path, "wb") as out:
-                    out.write(data)
-                
-                extracted += 1
+        records = [
+            record
+            for path, record in self.files.items()
+            if not filter_pattern or Path(path).match(filter_pattern)
+        ]
         
+        # Each worker thread reads through its own handle, so no seeks are shared
+        local = threading.local()
+        handles: list[BinaryIO] = []
+        
+        def extract_one(record: BA2FileRecord) -> None:
+            f = getattr(local, "handle", None)
+            if f is None:
+                f = local.handle = open(self.ba2_path, "rb")
+                handles.append(f)
+            self._extract_record(f, record, output_dir)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                for _ in executor.map(extract_one, records):
+                    pass
+        finally:
+            for handle in handles:
+                handle.close()
+        
+        extracted = len(records)
         self.logger.info(f"Extracted {extracted} files to {output_dir}")
         return extracted
     
+    def _extract_record(self, f: BinaryIO, record: BA2FileRecord, output_dir: Path) -> None:
+        """Read, decompress and write a single file from the archive."""
+        # Read file data
+        f.seek(record.offset)
+        if record.packed_size > 0:
+            compressed_data = f.read(record.packed_size)
+            data = zlib.decompress(compressed_data)
+        else:
+            data = f.read(record.unpacked_size)
+        
+        # Write to output
+        output_path = output_dir / record.path
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "wb") as out:
+            out.write(data)
+    
     def list_files(self) -> list[str]:
         """List all files in the archive."""
         return list(self.files.keys())
@@ -446,21 +634,18 @@ class Archive2Builder:
             progress_callback(f"Creating archive: {output_path.name}")
         
         try:
-            result = subprocess.run(
+            return_code, output = self._run_archive2(
                 cmd,
-                capture_output=True,
-                text=True,
                 timeout=600,  # 10 minute timeout for large archives
             )
             
-            if result.returncode != 0:
+            if return_code != 0:
                 raise Archive2Error(
-                    message=self._parse_error(result.stderr, result.stdout),
+                    message=self._parse_error("", output),
                     operation="create",
                     archive_path=str(output_path),
-                    return_code=result.returncode,
-                    stdout=result.stdout,
-                    stderr=result.stderr,
+                    return_code=return_code,
+                    stdout=output,
                 )
             
             if progress_callback:
@@ -482,6 +667,45 @@ class Archive2Builder:
                 archive_path=str(output_path),
             )
 
+    def _run_archive2(self, cmd: list[str], timeout: float) -> tuple[int, str]:
+        """
+        Run Archive2.exe, keeping only the tail of its combined output.
+        
+        Args:
+            cmd: Command line to execute
+            timeout: Seconds before the process is killed
+            
+        Returns:
+            Tuple of (return_code, output_tail)
+            
+        Raises:
+            subprocess.TimeoutExpired: If the process exceeds the timeout
+        """
+        with subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=PIPE_BUFFER_SIZE,
+            text=True,
+            errors="replace",
+        ) as process:
+            # Drain the pipe on a thread so the wait below can time out
+            output_tail: deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+            reader = threading.Thread(
+                target=output_tail.extend, args=(process.stdout,), daemon=True
+            )
+            reader.start()
+            try:
+                return_code = process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                raise
+            finally:
+                reader.join()
+        
+        return return_code, "".join(output_tail)
+
     def extract_archive(
         self,
         ba2_path: Path,
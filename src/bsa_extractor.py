@@ -1,19 +1,123 @@
 """BSA archive extraction utilities for Fallout 3 archives."""
 
+import fnmatch
 import logging
+import mmap
+import os
+import re
 import struct
+import sys
 import zlib
-from pathlib import Path
-from typing import BinaryIO, Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PureWindowsPath
+from typing import BinaryIO, Callable, NamedTuple, Optional
+
+try:
+    import deflate  # Optional: libdeflate bindings, faster than stdlib zlib
+except ImportError:
+    deflate = None
 
 logger = logging.getLogger(__name__)
 
+# Header: id, version, offset, archive flags, folder count, file count,
+# total folder name length, total file name length, file flags
+_HEADER = struct.Struct("<4sIIIIIIII")
+
+# Folder and file records share the layout: hash (u64), count/size (u32), offset (u32)
+_RECORD = struct.Struct("<QII")
+
+# Uncompressed size (u32) stored ahead of each compressed entry
+_ENTRY_SIZE = struct.Struct("<I")
+
+# Compressed entries larger than this are inflated in chunks straight to disk
+_DECOMPRESS_CHUNK_SIZE = 256 * 1024
+
+# Entries handed to an extraction worker at a time
+_EXTRACT_BATCH_SIZE = 64
+
+# os.sendfile can copy between regular files only on Linux
+_USE_SENDFILE = sys.platform.startswith("linux")
+
+
+def _split_archive_path(path: str) -> list[str]:
+    """Split an archive path into parts the way PureWindowsPath does."""
+    return [part for part in re.split(r"[\\/]", path) if part not in ("", ".")]
+
+
+def _write_all(out_file: BinaryIO, data: bytes) -> None:
+    """Write all of data to an unbuffered file, continuing after short writes."""
+    with memoryview(data) as view:
+        written = 0
+        while written < len(view):
+            written += out_file.write(view[written:])
+
+
+class _PathFilter:
+    """
+    Glob filter for archive paths, parsed once per extraction.
+
+    Matches the way Path.match does on Windows: case-insensitive, with a
+    relative pattern compared part by part against the end of the path.
+    The folder part of the pattern is checked once per folder, so files
+    in excluded folders are skipped without looking at their names.
+    """
+
+    def __init__(self, filter_pattern: str) -> None:
+        pattern = PureWindowsPath(filter_pattern)
+        if not pattern.parts:
+            raise ValueError(f"Empty filter pattern: {filter_pattern!r}")
+
+        # Archive paths are relative, so an anchored pattern never matches
+        self.anchored = bool(pattern.drive or pattern.root)
+
+        # Last part first, to line up with the end of the path
+        self._part_matchers = [
+            re.compile(fnmatch.translate(part), re.IGNORECASE).match
+            for part in reversed(pattern.parts)
+        ]
+        self._folder_matches: dict[str, bool] = {}
+
+    def matches(self, path: str) -> bool:
+        """Check whether a full archive path matches the pattern."""
+        if self.anchored:
+            return False
+        return self._match_parts(self._part_matchers, _split_archive_path(path))
+
+    def matches_file(self, folder_name: str, file_name: str) -> bool:
+        """Check whether a file in an archive folder matches the pattern."""
+        if self.anchored:
+            return False
+
+        name_parts = _split_archive_path(file_name)
+        if len(name_parts) != 1:
+            # Unusual name that is not a single path part
+            full_path = f"{folder_name}\\{file_name}" if folder_name else file_name
+            return self.matches(full_path)
+
+        folder_matches = self._folder_matches.get(folder_name)
+        if folder_matches is None:
+            folder_matches = self._match_parts(
+                self._part_matchers[1:], _split_archive_path(folder_name)
+            )
+            self._folder_matches[folder_name] = folder_matches
+
+        return folder_matches and self._part_matchers[0](name_parts[0]) is not None
+
+    @staticmethod
+    def _match_parts(part_matchers: list[Callable], parts: list[str]) -> bool:
+        """Match pattern parts, last first, against the trailing path parts."""
+        if len(part_matchers) > len(parts):
+            return False
+        return all(
+            match(part) for match, part in zip(part_matchers, reversed(parts))
+        )
+
 
 class BSAHeader:
     """BSA file header structure."""
 
     def __init__(self, data: bytes) -> None:
-        """Parse BSA header from raw bytes."""
+        """Parse BSA header from the start of raw bytes or a mapped archive."""
         (
             self.file_id,
             self.version,
@@ -24,47 +128,25 @@ class BSAHeader:
             self.total_folder_name_length,
             self.total_file_name_length,
             self.file_flags,
-        ) = struct.unpack("<4sIIIIIIII", data[:36])
+        ) = _HEADER.unpack_from(data)
 
-    @property
-    def is_valid(self) -> bool:
-        """Check if this is a valid BSA file."""
-        return self.file_id == b"BSA\x00"
-
-    @property
-    def has_folder_names(self) -> bool:
-        """Check if archive includes folder names."""
-        return bool(self.archive_flags & 0x1)
-
-    @property
-    def has_file_names(self) -> bool:
-        """Check if archive includes file names."""
-        return bool(self.archive_flags & 0x2)
-
-    @property
-    def is_compressed(self) -> bool:
-        """Check if files are compressed by default."""
-        return bool(self.archive_flags & 0x4)
-
-    @property
-    def is_xbox(self) -> bool:
-        """Check if this is an Xbox archive."""
-        return bool(self.archive_flags & 0x40)
-
-    @property
-    def has_embedded_names(self) -> bool:
-        """Check if file names are embedded in file data."""
-        return bool(self.archive_flags & 0x100)
-
-    @property
-    def uses_xmem(self) -> bool:
-        """Check if archive uses XMem compression."""
-        return bool(self.archive_flags & 0x200)
+        # Flags are checked for every record, so decode them once here
+        # rather than through properties
+        flags = self.archive_flags
+        self.is_valid = self.file_id == b"BSA\x00"
+        self.has_folder_names = bool(flags & 0x1)  # Archive includes folder names
+        self.has_file_names = bool(flags & 0x2)  # Archive includes file names
+        self.is_compressed = bool(flags & 0x4)  # Files are compressed by default
+        self.is_xbox = bool(flags & 0x40)  # Xbox archive
+        self.has_embedded_names = bool(flags & 0x100)  # File names embedded in file data
+        self.uses_xmem = bool(flags & 0x200)  # XMem compression
 
 
 class BSAFolderRecord:
     """Folder record in BSA archive."""
     
+    __slots__ = ("name_hash", "count", "offset", "name")
+    
     def __init__(self, name_hash: int, count: int, offset: int):
         self.name_hash = name_hash
         self.count = count
@@ -75,6 +157,11 @@ class BSAFolderRecord:
 class BSAFileRecord:
     """File record in BSA archive."""
     
+    # One record per archived file; slots keep large archives compact
+    __slots__ = (
+        "name_hash", "compression_toggle", "size", "offset", "name", "default_compressed"
+    )
+    
     def __init__(self, name_hash: int, size: int, offset: int, default_compressed: bool):
         self.name_hash = name_hash
         # Size field: bit 30 = compression toggle, bits 0-29 = size
@@ -91,6 +178,13 @@ class BSAFileRecord:
         return self.default_compressed != self.compression_toggle
 
 
+class BSAIndex(NamedTuple):
+    """Parsed BSA header and file records."""
+
+    header: BSAHeader
+    records: list[tuple[str, BSAFileRecord]]  # (folder name, file record)
+
+
 class BSAExtractor:
     """Extract files from Bethesda Softworks Archive (BSA) files."""
 
@@ -99,6 +193,7 @@ class BSAExtractor:
     def __init__(self) -> None:
         """Initialize the BSA extractor."""
         self.logger = logging.getLogger(__name__)
+        self._index_cache: dict[tuple[str, int, int], BSAIndex] = {}
 
     def extract(
         self,
@@ -125,48 +220,69 @@ class BSAExtractor:
         output_dir.mkdir(parents=True, exist_ok=True)
 
         with open(bsa_path, "rb") as bsa_file:
-            # Read and validate header
-            header_data = bsa_file.read(36)
-            header = BSAHeader(header_data)
-
-            if not header.is_valid:
+            if bsa_path.stat().st_size < _HEADER.size:
                 raise ValueError(f"Invalid BSA file: {bsa_path}")
 
-            if header.version not in self.SUPPORTED_VERSIONS:
-                self.logger.warning(
-                    f"BSA version {header.version} may not be fully supported"
-                )
+            # Map the archive so parsing and extraction work on slices
+            # instead of many small read/seek calls
+            with mmap.mmap(bsa_file.fileno(), 0, access=mmap.ACCESS_READ) as bsa_data:
+                index = self._parse_index(bsa_path, bsa_data)
+                header = index.header
 
-            self.logger.debug(
-                f"BSA contains {header.folder_count} folders, "
-                f"{header.file_count} files, compressed={header.is_compressed}"
-            )
+                if header.version not in self.SUPPORTED_VERSIONS:
+                    self.logger.warning(
+                        f"BSA version {header.version} may not be fully supported"
+                    )
 
-            # Extract files
-            extracted_count = self._extract_files(
-                bsa_file, header, output_dir, filter_pattern
-            )
+                self.logger.debug(
+                    f"BSA contains {header.folder_count} folders, "
+                    f"{header.file_count} files, compressed={header.is_compressed}"
+                )
+
+                # Extract files
+                extracted_count = self._extract_files(
+                    bsa_file, bsa_data, index, output_dir, filter_pattern
+                )
 
         self.logger.info(f"Extracted {extracted_count} files to {output_dir}")
         return output_dir
 
-    def _extract_files(
-        self,
-        bsa_file: BinaryIO,
-        header: BSAHeader,
-        output_dir: Path,
-        filter_pattern: Optional[str],
-    ) -> int:
-        """Extract files from the BSA archive."""
-        extracted_count = 0
+    def _parse_index(self, bsa_path: Path, bsa_data: mmap.mmap) -> BSAIndex:
+        """
+        Parse the header, folder and file records, and names of a BSA archive.
+
+        Results are cached per path and modification time, so listing and
+        then extracting the same archive only parses it once.
+
+        Args:
+            bsa_path: Path to the BSA file
+            bsa_data: Memory-mapped contents of the BSA file
 
-        # Read folder records
-        folder_records: list[BSAFolderRecord] = []
-        for _ in range(header.folder_count):
-            name_hash = struct.unpack("<Q", bsa_file.read(8))[0]
-            count = struct.unpack("<I", bsa_file.read(4))[0]
-            offset = struct.unpack("<I", bsa_file.read(4))[0]
-            folder_records.append(BSAFolderRecord(name_hash, count, offset))
+        Returns:
+            Parsed archive index
+        """
+        stat = bsa_path.stat()
+        cache_key = (str(bsa_path), stat.st_mtime_ns, stat.st_size)
+        cached = self._index_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Read and validate header
+        header = BSAHeader(bsa_data)
+
+        if not header.is_valid:
+            raise ValueError(f"Invalid BSA file: {bsa_path}")
+
+        position = _HEADER.size  # Records start right after the header
+
+        # Read folder records in one block
+        folder_data_size = header.folder_count * _RECORD.size
+        folder_data = bsa_data[position:position + folder_data_size]
+        position += folder_data_size
+        folder_records = [
+            BSAFolderRecord(name_hash, count, offset)
+            for name_hash, count, offset in _RECORD.iter_unpack(folder_data)
+        ]
 
         # Read file record blocks (folder name + file records for each folder)
         all_file_records: list[tuple[str, BSAFileRecord]] = []
@@ -174,74 +290,227 @@ class BSAExtractor:
         for folder in folder_records:
             # Read folder name
             if header.has_folder_names:
-                name_len = struct.unpack("<B", bsa_file.read(1))[0]
-                folder_name = bsa_file.read(name_len).decode("cp1252", errors="replace")
-                folder.name = folder_name.rstrip("\x00")
+                name_len = bsa_data[position]
+                folder_name = bsa_data[position + 1:position + 1 + name_len]
+                folder.name = folder_name.decode("cp1252", errors="replace").rstrip("\x00")
+                position += 1 + name_len
             
-            # Read file records for this folder
-            for _ in range(folder.count):
-                file_hash = struct.unpack("<Q", bsa_file.read(8))[0]
-                size = struct.unpack("<I", bsa_file.read(4))[0]
-                offset = struct.unpack("<I", bsa_file.read(4))[0]
-                
+            # Read file records for this folder in one block
+            record_data_size = folder.count * _RECORD.size
+            record_data = bsa_data[position:position + record_data_size]
+            position += record_data_size
+            for file_hash, size, offset in _RECORD.iter_unpack(record_data):
                 file_record = BSAFileRecord(file_hash, size, offset, header.is_compressed)
                 all_file_records.append((folder.name, file_record))
 
-        # Read file names from the file name block
+        # Read the whole file name block and split the null-terminated names
         if header.has_file_names:
-            for folder_name, file_record in all_file_records:
-                # Read null-terminated string
-                name_bytes = b""
-                while True:
-                    char = bsa_file.read(1)
-                    if char == b"\x00" or char == b"":
-                        break
-                    name_bytes += char
+            name_block = bsa_data[position:position + header.total_file_name_length]
+            names = name_block.split(b"\x00")
+            if len(names) <= len(all_file_records):
+                # The stored block length is too short; find each terminator instead
+                names = self._scan_names(bsa_data, position, len(all_file_records))
+            for (folder_name, file_record), name_bytes in zip(all_file_records, names):
                 file_record.name = name_bytes.decode("cp1252", errors="replace")
 
-        # Now extract the actual file data
-        for folder_name, file_record in all_file_records:
-            full_path = f"{folder_name}\\{file_record.name}" if folder_name else file_record.name
-            
+        index = BSAIndex(header, all_file_records)
+        self._index_cache[cache_key] = index
+        return index
+
+    @staticmethod
+    def _scan_names(bsa_data: mmap.mmap, position: int, count: int) -> list[bytes]:
+        """Read null-terminated names one by one, stopping at the end of the archive."""
+        names: list[bytes] = []
+        for _ in range(count):
+            end = bsa_data.find(b"\x00", position)
+            if end == -1:
+                end = len(bsa_data)
+            names.append(bsa_data[position:end])
+            position = end + 1
+        return names
+
+    def _extract_files(
+        self,
+        bsa_file: BinaryIO,
+        bsa_data: mmap.mmap,
+        index: BSAIndex,
+        output_dir: Path,
+        filter_pattern: Optional[str],
+    ) -> int:
+        """Extract files from the memory-mapped BSA archive."""
+        header = index.header
+
+        path_filter = _PathFilter(filter_pattern) if filter_pattern else None
+
+        # Resolve what to extract up front so the workers only copy data
+        jobs: list[tuple[str, int, int, bool, Path]] = []
+        for folder_name, file_record in index.records:
             # Apply filter if specified
-            if filter_pattern:
-                if not Path(full_path).match(filter_pattern):
-                    continue
+            if path_filter and not path_filter.matches_file(folder_name, file_record.name):
+                continue
+            
+            full_path = f"{folder_name}\\{file_record.name}" if folder_name else file_record.name
             
-            # Seek to file data
-            bsa_file.seek(file_record.offset)
+            offset = file_record.offset
             
             # Handle embedded file name (for archives with flag 0x100)
             actual_size = file_record.size
             if header.has_embedded_names:
-                embedded_len = struct.unpack("<B", bsa_file.read(1))[0]
-                bsa_file.read(embedded_len)  # Skip embedded name
+                embedded_len = bsa_data[offset]
+                offset += 1 + embedded_len  # Skip embedded name
                 actual_size -= (1 + embedded_len)
             
-            # Read file data
-            if file_record.is_compressed:
-                # First 4 bytes are the uncompressed size
-                uncompressed_size = struct.unpack("<I", bsa_file.read(4))[0]
-                compressed_data = bsa_file.read(actual_size - 4)
-                try:
-                    file_data = zlib.decompress(compressed_data)
-                except zlib.error as e:
-                    self.logger.warning(f"Failed to decompress {full_path}: {e}")
-                    continue
-            else:
-                file_data = bsa_file.read(actual_size)
-            
-            # Write file
             output_path = output_dir / full_path.replace("\\", "/")
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(output_path, "wb") as out_file:
-                out_file.write(file_data)
-            
-            extracted_count += 1
+            jobs.append(
+                (full_path, offset, actual_size, file_record.is_compressed, output_path)
+            )
+
+        # Create each output folder once rather than once per file. Folders
+        # that are ancestors of another one are created along with it.
+        parents = {output_path.parent for *_, output_path in jobs}
+        ancestors = {ancestor for parent in parents for ancestor in parent.parents}
+        for parent in parents - ancestors:
+            parent.mkdir(parents=True, exist_ok=True)
+
+        # zlib and file writes release the GIL, so threads scale across cores.
+        # Workers take batches so the per-task overhead is paid once per batch.
+        batches = [
+            jobs[start:start + _EXTRACT_BATCH_SIZE]
+            for start in range(0, len(jobs), _EXTRACT_BATCH_SIZE)
+        ]
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            results = executor.map(
+                lambda batch: self._extract_batch(bsa_file, bsa_data, batch), batches
+            )
+            extracted_count = sum(results)
 
         return extracted_count
 
+    def _extract_batch(
+        self,
+        bsa_file: BinaryIO,
+        bsa_data: mmap.mmap,
+        batch: list[tuple[str, int, int, bool, Path]],
+    ) -> int:
+        """
+        Extract a batch of BSA entries to disk.
+
+        Returns:
+            Number of files written
+        """
+        extract_one = self._extract_one
+        return sum(extract_one(bsa_file, bsa_data, *job) for job in batch)
+
+    def _extract_one(
+        self,
+        bsa_file: BinaryIO,
+        bsa_data: mmap.mmap,
+        full_path: str,
+        offset: int,
+        size: int,
+        is_compressed: bool,
+        output_path: Path,
+    ) -> bool:
+        """
+        Extract a single BSA entry to disk.
+
+        Returns:
+            True if the file was written, False if it was skipped
+        """
+        try:
+            # Each entry is written in a few large writes, so skip the
+            # buffered layer and write to the raw file
+            with open(output_path, "wb", buffering=0) as out_file:
+                if is_compressed:
+                    self._write_decompressed(bsa_data, offset, offset + size, out_file)
+                else:
+                    self._write_stored(bsa_file, bsa_data, offset, offset + size, out_file)
+        except zlib.error as e:
+            # Don't leave a partially inflated file behind
+            output_path.unlink(missing_ok=True)
+            self.logger.warning(f"Failed to decompress {full_path}: {e}")
+            return False
+        except OSError as e:
+            # A truncated archive or failed write loses this entry only,
+            # not the rest of the extraction
+            output_path.unlink(missing_ok=True)
+            self.logger.warning(f"Failed to extract {full_path}: {e}")
+            return False
+        
+        return True
+
+    def _write_stored(
+        self,
+        bsa_file: BinaryIO,
+        bsa_data: mmap.mmap,
+        start: int,
+        end: int,
+        out_file: BinaryIO,
+    ) -> None:
+        """
+        Copy an uncompressed BSA entry into an open output file.
+
+        Uses os.sendfile on Linux so the data never enters user space, and
+        writes straight from the mapping elsewhere.
+        """
+        if not _USE_SENDFILE:
+            with memoryview(bsa_data) as view:
+                _write_all(out_file, view[start:end])
+            return
+
+        while start < end:
+            count = os.sendfile(out_file.fileno(), bsa_file.fileno(), start, end - start)
+            if count == 0:
+                raise OSError(f"Unexpected end of archive at offset {start}")
+            start += count
+
+    def _write_decompressed(
+        self,
+        bsa_data: mmap.mmap,
+        start: int,
+        end: int,
+        out_file: BinaryIO,
+    ) -> None:
+        """
+        Inflate a compressed BSA entry into an open output file.
+
+        Small entries are inflated in one call into a buffer sized from the
+        stored uncompressed size, using libdeflate when the optional deflate
+        package is installed. Larger ones are inflated in chunks and
+        written as they go, so memory use stays at the chunk size.
+
+        Raises:
+            zlib.error: If the data is corrupt or truncated
+        """
+        # First 4 bytes are the uncompressed size
+        (uncompressed_size,) = _ENTRY_SIZE.unpack_from(bsa_data, start)
+        start += _ENTRY_SIZE.size
+
+        if end - start <= _DECOMPRESS_CHUNK_SIZE:
+            compressed_data = bsa_data[start:end]
+            if deflate is not None:
+                try:
+                    _write_all(out_file, deflate.zlib_decompress(compressed_data, uncompressed_size))
+                    return
+                except deflate.DeflateError:
+                    # libdeflate needs the exact size; let zlib decide if the data is bad
+                    pass
+            
+            # Size the output buffer once instead of growing it
+            _write_all(out_file, zlib.decompress(compressed_data, bufsize=uncompressed_size))
+            return
+
+        # Each entry is its own zlib stream, and decompress objects cannot be
+        # reset, so a fresh one per entry is the cheapest option
+        decompressor = zlib.decompressobj()
+        for chunk_start in range(start, end, _DECOMPRESS_CHUNK_SIZE):
+            chunk_end = min(chunk_start + _DECOMPRESS_CHUNK_SIZE, end)
+            _write_all(out_file, decompressor.decompress(bsa_data[chunk_start:chunk_end]))
+        _write_all(out_file, decompressor.flush())
+
+        if not decompressor.eof:
+            raise zlib.error("incomplete or truncated stream")
+
     def list_contents(self, bsa_path: Path) -> list[str]:
         """
         List all files in a BSA archive.
@@ -253,51 +522,22 @@ class BSAExtractor:
             List of file paths within the archive
         """
         self.logger.info(f"Listing contents of: {bsa_path}")
-        files: list[str] = []
 
         with open(bsa_path, "rb") as bsa_file:
-            header_data = bsa_file.read(36)
-            header = BSAHeader(header_data)
-
-            if not header.is_valid:
+            if bsa_path.stat().st_size < _HEADER.size:
                 raise ValueError(f"Invalid BSA file: {bsa_path}")
 
-            # Read folder records
-            folder_records: list[BSAFolderRecord] = []
-            for _ in range(header.folder_count):
-                name_hash = struct.unpack("<Q", bsa_file.read(8))[0]
-                count = struct.unpack("<I", bsa_file.read(4))[0]
-                offset = struct.unpack("<I", bsa_file.read(4))[0]
-                folder_records.append(BSAFolderRecord(name_hash, count, offset))
-
-            # Read file records
-            all_records: list[tuple[str, BSAFileRecord]] = []
-            for folder in folder_records:
-                if header.has_folder_names:
-                    name_len = struct.unpack("<B", bsa_file.read(1))[0]
-                    folder_name = bsa_file.read(name_len).decode("cp1252", errors="replace")
-                    folder.name = folder_name.rstrip("\x00")
-                
-                for _ in range(folder.count):
-                    file_hash = struct.unpack("<Q", bsa_file.read(8))[0]
-                    size = struct.unpack("<I", bsa_file.read(4))[0]
-                    offset = struct.unpack("<I", bsa_file.read(4))[0]
-                    file_record = BSAFileRecord(file_hash, size, offset, header.is_compressed)
-                    all_records.append((folder.name, file_record))
-
-            # Read file names
-            if header.has_file_names:
-                for folder_name, file_record in all_records:
-                    name_bytes = b""
-                    while True:
-                        char = bsa_file.read(1)
-                        if char == b"\x00" or char == b"":
-                            break
-                        name_bytes += char
-                    file_record.name = name_bytes.decode("cp1252", errors="replace")
-                    files.append(f"{folder_name}\\{file_record.name}" if folder_name else file_record.name)
-
-        return files
+            with mmap.mmap(bsa_file.fileno(), 0, access=mmap.ACCESS_READ) as bsa_data:
+                index = self._parse_index(bsa_path, bsa_data)
+
+        # Names are only known when the archive stores them
+        if not index.header.has_file_names:
+            return []
+
+        return [
+            f"{folder_name}\\{file_record.name}" if folder_name else file_record.name
+            for folder_name, file_record in index.records
+        ]
 
     def extract_audio_only(self, bsa_path: Path, output_dir: Path) -> Path:
         """
@@ -0,0 +1,29 @@
+"""File staging helpers shared by the CLI and the GUI."""
+
+import os
+import shutil
+from pathlib import Path
+from typing import Union
+
+
+def link_or_copy(src: Union[str, Path], dst: Union[str, Path]) -> None:
+    """
+    Hard link a file into place, copying it when linking isn't possible.
+
+    An existing destination is replaced rather than written over, since it
+    may itself be a link to another source file. Anything later written at
+    a staged path must likewise be unlinked first, or it would go through
+    the link into the original.
+
+    Args:
+        src: File to stage
+        dst: Destination path
+    """
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        os.unlink(dst)
+        link_or_copy(src, dst)
+    except OSError:
+        # Different volume, or a file system without hard links
+        shutil.copy2(src, dst)
@@ -1,12 +1,43 @@
 """FUZ file processing for Fallout lip sync audio files."""
 
 import logging
+import os
+import shutil
 import struct
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, NamedTuple
+from typing import BinaryIO, Optional, NamedTuple
 
 logger = logging.getLogger(__name__)
 
+# Magic, version, and lip data size
+_FUZ_HEADER = struct.Struct("<4sII")
+
+COPY_BUFFER_SIZE = 1 << 20
+
+# os.sendfile can copy between regular files only on Linux
+_USE_SENDFILE = sys.platform.startswith("linux")
+
+
+def _copy_to_end(src: BinaryIO, dst: BinaryIO) -> None:
+    """Copy from the current position of src to its end without buffering it all."""
+    if not _USE_SENDFILE:
+        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+        return
+
+    dst.flush()
+    offset = src.tell()
+    end = os.fstat(src.fileno()).st_size
+    while offset < end:
+        count = os.sendfile(dst.fileno(), src.fileno(), offset, end - offset)
+        if count == 0:
+            break
+        offset += count
+
+    # sendfile advanced the descriptor; resync the buffered writer
+    dst.seek(0, os.SEEK_END)
+
 
 class FUZHeader(NamedTuple):
     """FUZ file header structure."""
@@ -34,6 +65,18 @@ class FUZProcessor:
         """Initialize the FUZ processor."""
         self.logger = logging.getLogger(__name__)
 
+    def _read_header(self, f: BinaryIO) -> FUZHeader:
+        """Read and validate the header of an open FUZ file."""
+        magic, version, lip_size = _FUZ_HEADER.unpack(f.read(_FUZ_HEADER.size))
+        if magic != self.MAGIC_FO3:
+            raise ValueError(f"Invalid FUZ file magic: {magic}")
+
+        self.logger.debug("FUZ version: %d", version)
+
+        file_size = os.fstat(f.fileno()).st_size
+        audio_size = max(file_size - _FUZ_HEADER.size - lip_size, 0)
+        return FUZHeader(magic, version, lip_size, audio_size)
+
     def read_fuz(self, fuz_path: Path) -> tuple[bytes, Optional[bytes]]:
         """
         Read and extract audio and lip data from a FUZ file.
@@ -44,32 +87,23 @@ class FUZProcessor:
         Returns:
             Tuple of (audio_data, lip_data) where lip_data may be None
         """
-        self.logger.debug(f"Reading FUZ file: {fuz_path}")
+        self.logger.debug("Reading FUZ file: %s", fuz_path)
 
         if not fuz_path.exists():
             raise FileNotFoundError(f"FUZ file not found: {fuz_path}")
 
-        with open(fuz_path, "rb") as f:
-            # Read header
-            magic = f.read(4)
-            if magic != self.MAGIC_FO3:
-                raise ValueError(f"Invalid FUZ file magic: {magic}")
-
-            version = struct.unpack("<I", f.read(4))[0]
-            self.logger.debug(f"FUZ version: {version}")
-
-            # Read sizes
-            lip_size = struct.unpack("<I", f.read(4))[0]
+        with open(fuz_path, "rb", buffering=COPY_BUFFER_SIZE) as f:
+            lip_size = self._read_header(f).lip_size
 
             # Read lip data if present
             lip_data: Optional[bytes] = None
             if lip_size > 0:
                 lip_data = f.read(lip_size)
-                self.logger.debug(f"Read {lip_size} bytes of lip data")
+                self.logger.debug("Read %d bytes of lip data", lip_size)
 
             # Read audio data (rest of file)
             audio_data = f.read()
-            self.logger.debug(f"Read {len(audio_data)} bytes of audio data")
+            self.logger.debug("Read %d bytes of audio data", len(audio_data))
 
         return audio_data, lip_data
 
@@ -91,12 +125,18 @@ class FUZProcessor:
         if output_path is None:
             output_path = fuz_path.with_suffix(".xwm")
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if not fuz_path.exists():
+            raise FileNotFoundError(f"FUZ file not found: {fuz_path}")
 
-        audio_data, _ = self.read_fuz(fuz_path)
+        with open(fuz_path, "rb") as f:
+            header = self._read_header(f)
 
-        with open(output_path, "wb") as f:
-            f.write(audio_data)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Skip the lip data and stream the audio instead of loading it
+            f.seek(_FUZ_HEADER.size + header.lip_size)
+            with open(output_path, "wb") as out_file:
+                _copy_to_end(f, out_file)
 
         self.logger.info(f"Extracted audio to: {output_path}")
         return output_path
@@ -119,9 +159,15 @@ class FUZProcessor:
         if output_path is None:
             output_path = fuz_path.with_suffix(".lip")
 
-        _, lip_data = self.read_fuz(fuz_path)
+        if not fuz_path.exists():
+            raise FileNotFoundError(f"FUZ file not found: {fuz_path}")
+
+        # Read only the header and lip block; the audio is never touched
+        with open(fuz_path, "rb") as f:
+            header = self._read_header(f)
+            lip_data = f.read(header.lip_size) if header.lip_size > 0 else b""
 
-        if lip_data is None or len(lip_data) == 0:
+        if not lip_data:
             self.logger.warning(f"No lip data in FUZ file: {fuz_path}")
             return None
 
@@ -133,6 +179,53 @@ class FUZProcessor:
         self.logger.info(f"Extracted lip data to: {output_path}")
         return output_path
 
+    def extract_both(
+        self,
+        fuz_path: Path,
+        audio_output: Optional[Path] = None,
+        lip_output: Optional[Path] = None,
+    ) -> tuple[Path, Optional[Path]]:
+        """
+        Extract audio and lip sync data from a FUZ file in a single pass.
+
+        Args:
+            fuz_path: Path to the FUZ file
+            audio_output: Path for extracted audio (default: same name with .xwm extension)
+            lip_output: Path for extracted lip data (default: same name with .lip extension)
+
+        Returns:
+            Tuple of (audio_path, lip_path) where lip_path is None if there is no lip data
+        """
+        if audio_output is None:
+            audio_output = fuz_path.with_suffix(".xwm")
+        if lip_output is None:
+            lip_output = fuz_path.with_suffix(".lip")
+
+        if not fuz_path.exists():
+            raise FileNotFoundError(f"FUZ file not found: {fuz_path}")
+
+        with open(fuz_path, "rb") as f:
+            header = self._read_header(f)
+
+            lip_path: Optional[Path] = None
+            lip_data = f.read(header.lip_size) if header.lip_size > 0 else b""
+            if lip_data:
+                lip_output.parent.mkdir(parents=True, exist_ok=True)
+                with open(lip_output, "wb") as out_file:
+                    out_file.write(lip_data)
+                lip_path = lip_output
+                self.logger.info(f"Extracted lip data to: {lip_output}")
+            else:
+                self.logger.warning(f"No lip data in FUZ file: {fuz_path}")
+
+            # Audio is the rest of the file
+            audio_output.parent.mkdir(parents=True, exist_ok=True)
+            with open(audio_output, "wb") as out_file:
+                _copy_to_end(f, out_file)
+            self.logger.info(f"Extracted audio to: {audio_output}")
+
+        return audio_output, lip_path
+
     def create_fuz(
         self,
         audio_path: Path,
@@ -164,10 +257,8 @@ class FUZProcessor:
 
         # Write FUZ file
         with open(output_path, "wb") as f:
-            # Write header
-            f.write(self.MAGIC_FO4)  # Magic
-            f.write(struct.pack("<I", 1))  # Version
-            f.write(struct.pack("<I", len(lip_data)))  # Lip size
+            # Write header: magic, version, lip size
+            f.write(_FUZ_HEADER.pack(self.MAGIC_FO4, 1, len(lip_data)))
 
             # Write lip data
             if lip_data:
@@ -204,25 +295,45 @@ class FUZProcessor:
 
         self.logger.info(f"Found {len(fuz_files)} FUZ files to process")
 
-        for fuz_path in fuz_files:
-            try:
-                # Preserve directory structure
-                relative_path = fuz_path.relative_to(input_dir)
-                output_path = output_dir / relative_path.with_suffix(".xwm")
-
-                audio_path = self.extract_audio(fuz_path, output_path)
-                extracted_files.append(audio_path)
-
-                # Also extract lip data
-                lip_output = output_dir / relative_path.with_suffix(".lip")
-                self.extract_lip(fuz_path, lip_output)
-
-            except Exception as e:
-                self.logger.error(f"Failed to process {fuz_path}: {e}")
+        # Each FUZ is independent and the work is mostly I/O, so overlap it
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for audio_path in executor.map(
+                lambda fuz_path: self._process_one(fuz_path, input_dir, output_dir),
+                fuz_files,
+            ):
+                if audio_path is not None:
+                    extracted_files.append(audio_path)
 
         self.logger.info(f"Processed {len(extracted_files)} FUZ files")
         return extracted_files
 
+    def _process_one(
+        self,
+        fuz_path: Path,
+        input_dir: Path,
+        output_dir: Path,
+    ) -> Optional[Path]:
+        """
+        Extract one FUZ file for process_directory.
+
+        Returns:
+            Path to the extracted audio file, or None if extraction failed
+        """
+        try:
+            # Preserve directory structure
+            relative_path = fuz_path.relative_to(input_dir)
+            output_path = output_dir / relative_path.with_suffix(".xwm")
+            lip_output = output_dir / relative_path.with_suffix(".lip")
+
+            # Read the FUZ once for both the audio and lip data
+            audio_path, _ = self.extract_both(fuz_path, output_path, lip_output)
+            return audio_path
+
+        except Exception as e:
+            self.logger.error(f"Failed to process {fuz_path}: {e}")
+            return None
+
     def convert_fo3_to_fo4(
         self,
         input_path: Path,
@@ -253,9 +364,7 @@ class FUZProcessor:
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         with open(output_path, "wb") as f:
-            f.write(self.MAGIC_FO4)
-            f.write(struct.pack("<I", 1))  # Version
-            f.write(struct.pack("<I", len(lip_data) if lip_data else 0))
+            f.write(_FUZ_HEADER.pack(self.MAGIC_FO4, 1, len(lip_data) if lip_data else 0))
 
             if lip_data:
                 f.write(lip_data)
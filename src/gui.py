@@ -8,16 +8,139 @@ import os
 import logging
 import webbrowser
 import ctypes
+import shutil
+import struct
+import subprocess
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, Callable
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
     QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QTextEdit, QFileDialog, QMessageBox, QGroupBox,
+    QPlainTextEdit, QFileDialog, QMessageBox, QGroupBox,
     QProgressBar, QCheckBox
 )
 from PyQt6.QtCore import QThread, pyqtSignal, Qt
+from PyQt6.QtGui import QTextCursor
+
+# Handle imports for both source and frozen executable
+if getattr(sys, 'frozen', False):
+    from src.bsa_extractor import BSAExtractor
+    from src.fuz_processor import FUZProcessor
+    from src.file_utils import link_or_copy
+else:
+    from bsa_extractor import BSAExtractor
+    from fuz_processor import FUZProcessor
+    from file_utils import link_or_copy
+
+
+# Canonical 44-byte PCM WAV header: RIFF chunk, fmt chunk, data chunk header
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+# Archive the GUI packs the whole staging folder into
+BA2_NAME = "Fallout3Audio - Main.ba2"
+
+# Archive2.exe time limit (seconds) and how much of its
+# output is kept for error messages
+ARCHIVE2_TIMEOUT = 1800
+ARCHIVE2_OUTPUT_TAIL_LINES = 200
+
+# Top-level staging folders that never hold MP3 or FUZ files
+NO_MP3_FOLDERS = {"voices", "menu_voices"}
+NO_FUZ_FOLDERS = {"music"}
+
+# Upper bound on parallel MP3 decodes; each one holds a whole track in memory
+MP3_DECODE_WORKERS = 8
+
+# Queued per-file progress messages are sent once this many build up, or
+# once this many seconds have passed since the last batch
+PROGRESS_BATCH_SIZE = 200
+PROGRESS_FLUSH_INTERVAL = 0.25
+
+# Number of processed FUZ files between progress messages
+FUZ_PROGRESS_INTERVAL = 500
+
+# Lines kept in the log view; older lines are dropped as new ones arrive
+LOG_MAX_LINES = 5000
+
+
+def _convert_one_mp3(mp3_path: str) -> None:
+    """
+    Decode one MP3 to a 16-bit WAV next to it.
+
+    The MP3 is left in place for the caller to remove. Errors are left to
+    the caller, which collects them from the future.
+    """
+    # Imported here so the GUI still starts without miniaudio; a missing
+    # module is then reported with the other conversion failures
+    import miniaudio
+    
+    # Decode MP3 straight to 16-bit PCM with miniaudio's MP3 decoder
+    decoded = miniaudio.mp3_read_file_s16(mp3_path)
+    
+    # Convert to WAV
+    wav_path = mp3_path[:-4] + ".wav"
+    channels = decoded.nchannels
+    rate = decoded.sample_rate
+    
+    # The music folder is staged with hard links, so a WAV already next to
+    # the MP3 may be the game's own file. Replace it rather than write
+    # through the link.
+    try:
+        os.unlink(wav_path)
+    except FileNotFoundError:
+        pass
+    
+    # Write the sample buffer as-is, without copying it into bytes.
+    # Samples pass through untouched; any future gain or dither step
+    # belongs in the decoder or ffmpeg, not a per-sample Python loop.
+    with memoryview(decoded.samples).cast("B") as samples, open(wav_path, "wb") as wav:
+        data_size = samples.nbytes
+        wav.write(_WAV_HEADER.pack(
+            b"RIFF", 36 + data_size, b"WAVE",
+            b"fmt ", 16, 1, channels, rate, rate * channels * 2, channels * 2, 16,
+            b"data", data_size,
+        ))
+        wav.write(samples)
+
+
+def _scan_audio_files(folder: Path) -> tuple[list[str], list[Path]]:
+    """
+    Collect MP3 and FUZ files under one top-level staging folder in a single walk.
+
+    Suffixes are compared case-insensitively and symlinked folders are
+    not followed, matching rglob on Windows. Staging folders known not
+    to hold a file type are not checked for it.
+
+    MP3s are returned as plain strings since the decoder takes strings;
+    FUZ files stay Paths for FUZProcessor.
+
+    Returns:
+        Tuple of (mp3_paths, fuz_files)
+    """
+    mp3_paths: list[str] = []
+    fuz_files: list[Path] = []
+    collect_mp3 = folder.name.lower() not in NO_MP3_FOLDERS
+    collect_fuz = folder.name.lower() not in NO_FUZ_FOLDERS
+
+    pending = [str(folder)]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                    continue
+                name = entry.name.lower()
+                if collect_mp3 and name.endswith(".mp3"):
+                    mp3_paths.append(entry.path)
+                elif collect_fuz and name.endswith(".fuz"):
+                    fuz_files.append(Path(entry.path))
+    return mp3_paths, fuz_files
 
 
 class ExtractWorker(QThread):
@@ -37,17 +160,40 @@ class ExtractWorker(QThread):
         self.output_path = output_path
         self.archive2_path = archive2_path
         self.convert_audio = convert_audio
+        self._pending_messages: list[str] = []
+        self._last_flush = 0.0
+        self._progress_lock = threading.Lock()
+
+    def _queue_progress(self, message: str):
+        """Queue a progress message, emitting queued messages in batches.
+        
+        Per-file messages from busy loops are sent as one signal every
+        PROGRESS_BATCH_SIZE messages or PROGRESS_FLUSH_INTERVAL seconds,
+        so the UI thread isn't flooded with appends. Safe to call from
+        any thread.
+        """
+        with self._progress_lock:
+            self._pending_messages.append(message)
+            if (
+                len(self._pending_messages) >= PROGRESS_BATCH_SIZE
+                or time.monotonic() - self._last_flush >= PROGRESS_FLUSH_INTERVAL
+            ):
+                self._flush_locked()
+
+    def _flush_progress(self):
+        """Emit any queued progress messages as a single signal."""
+        with self._progress_lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        """Emit queued progress messages; the caller holds the lock."""
+        if self._pending_messages:
+            self.progress.emit("\n".join(self._pending_messages))
+            self._pending_messages.clear()
+        self._last_flush = time.monotonic()
 
     def run(self):
         try:
-            # Handle imports for both source and frozen executable
-            if getattr(sys, 'frozen', False):
-                from src.bsa_extractor import BSAExtractor
-                from src.fuz_processor import FUZProcessor
-            else:
-                from bsa_extractor import BSAExtractor
-                from fuz_processor import FUZProcessor
-
             fo3_data = Path(self.fo3_data_path)
             output_dir = Path(self.output_path)
             
@@ -67,73 +213,131 @@ class ExtractWorker(QThread):
             menu_voices_bsa = fo3_data / "Fallout - MenuVoices.bsa"
             music_dir = fo3_data / "Music"
 
-            # Extract main sound BSA
-            if sound_bsa.exists():
-                self.progress.emit(f"Extracting {sound_bsa.name}...")
-                extractor.extract(sound_bsa, temp_dir / "sound")
-                self.progress.emit(f"  Extracted {sound_bsa.name}")
-            else:
-                self.progress.emit(f"Warning: {sound_bsa.name} not found")
-
-            # Extract voices BSA
-            if voices_bsa.exists():
-                self.progress.emit(f"Extracting {voices_bsa.name}...")
-                extractor.extract(voices_bsa, temp_dir / "voices")
-                self.progress.emit(f"  Extracted {voices_bsa.name}")
-            else:
-                self.progress.emit(f"Warning: {voices_bsa.name} not found")
-
-            # Extract menu voices BSA
-            if menu_voices_bsa.exists():
-                self.progress.emit(f"Extracting {menu_voices_bsa.name}...")
-                extractor.extract(menu_voices_bsa, temp_dir / "menu_voices")
-                self.progress.emit(f"  Extracted {menu_voices_bsa.name}")
-
-            # Extract DLC sound BSAs
-            dlc_bsas = [
-                ("Anchorage - Sounds.bsa", "Anchorage"),
-                ("ThePitt - Sounds.bsa", "ThePitt"),
-                ("BrokenSteel - Sounds.bsa", "BrokenSteel"),
-                ("PointLookout - Sounds.bsa", "PointLookout"),
-                ("Zeta - Sounds.bsa", "Zeta"),
-            ]
-            
-            for bsa_name, dlc_name in dlc_bsas:
-                dlc_bsa = fo3_data / bsa_name
-                if dlc_bsa.exists():
-                    self.progress.emit(f"Extracting {bsa_name}...")
-                    extractor.extract(dlc_bsa, temp_dir / "dlc" / dlc_name)
-                    self.progress.emit(f"  Extracted {bsa_name}")
-
-            # Copy music files
-            if music_dir.exists():
-                self.progress.emit("Copying music files...")
-                import shutil
-                music_output = temp_dir / "music"
-                if music_output.exists():
-                    shutil.rmtree(music_output)
-                shutil.copytree(music_dir, music_output)
-                self.progress.emit("  Copied music files")
-            else:
-                self.progress.emit(f"Warning: Music folder not found at {music_dir}")
-
-            # Convert MP3 files to xWMA (FO4 doesn't support MP3 in BA2)
-            self.progress.emit("Converting MP3 files to xWMA...")
-            mp3_files = list(temp_dir.rglob("*.mp3"))
-            if mp3_files:
-                converted_count = self._convert_mp3_files(mp3_files)
-                self.progress.emit(f"  Converted {converted_count} MP3 files to xWMA")
-            else:
-                self.progress.emit("  No MP3 files to convert")
-
-            # Process FUZ files
-            self.progress.emit("Processing FUZ files...")
+            # FUZ files are queued for processing as soon as their staging
+            # folder is extracted, so the pool works through them while the
+            # remaining archives extract and the MP3s convert
             fuz_processor = FUZProcessor()
-            for fuz_file in temp_dir.rglob("*.fuz"):
+            fuz_futures = {}
+            mp3_paths: list[str] = []
+            scanned: set[str] = set()
+            workers = min(32, (os.cpu_count() or 1) * 4)
+
+            with ThreadPoolExecutor(max_workers=workers) as fuz_executor:
+
+                def queue_audio(folder_name: str):
+                    """Scan a finished staging folder and queue its FUZ files."""
+                    scanned.add(folder_name)
+                    folder_mp3s, folder_fuzs = _scan_audio_files(temp_dir / folder_name)
+                    mp3_paths.extend(folder_mp3s)
+                    for fuz_file in folder_fuzs:
+                        future = fuz_executor.submit(fuz_processor.extract_audio, fuz_file)
+                        fuz_futures[future] = fuz_file
+
                 try:
-                    fuz_processor.extract_audio(str(fuz_file))
-                except Exception as e:
-                    self.progress.emit(f"  Warning: Could not process {fuz_file.name}: {e}")
+                    # Extract main sound BSA
+                    if sound_bsa.exists():
+                        self.progress.emit(f"Extracting {sound_bsa.name}...")
+                        extractor.extract(sound_bsa, temp_dir / "sound")
+                        self.progress.emit(f"  Extracted {sound_bsa.name}")
+                        queue_audio("sound")
+                    else:
+                        self.progress.emit(f"Warning: {sound_bsa.name} not found")
+
+                    # Extract voices BSA
+                    if voices_bsa.exists():
+                        self.progress.emit(f"Extracting {voices_bsa.name}...")
+                        extractor.extract(voices_bsa, temp_dir / "voices")
+                        self.progress.emit(f"  Extracted {voices_bsa.name}")
+                        queue_audio("voices")
+                    else:
+                        self.progress.emit(f"Warning: {voices_bsa.name} not found")
+
+                    # Extract menu voices BSA
+                    if menu_voices_bsa.exists():
+                        self.progress.emit(f"Extracting {menu_voices_bsa.name}...")
+                        extractor.extract(menu_voices_bsa, temp_dir / "menu_voices")
+                        self.progress.emit(f"  Extracted {menu_voices_bsa.name}")
+                        queue_audio("menu_voices")
+
+                    # Extract DLC sound BSAs
+                    dlc_bsas = [
+                        ("Anchorage - Sounds.bsa", "Anchorage"),
+                        ("ThePitt - Sounds.bsa", "ThePitt"),
+                        ("BrokenSteel - Sounds.bsa", "BrokenSteel"),
+                        ("PointLookout - Sounds.bsa", "PointLookout"),
+                        ("Zeta - Sounds.bsa", "Zeta"),
+                    ]
+                
+                    dlc_present = [
+                        (bsa_name, dlc_name) for bsa_name, dlc_name in dlc_bsas
+                        if (fo3_data / bsa_name).exists()
+                    ]
+                
+                    # Each DLC archive extracts into its own folder, so they can
+                    # run side by side
+                    if dlc_present:
+                        with ThreadPoolExecutor(max_workers=len(dlc_present)) as executor:
+                            futures = {}
+                            for bsa_name, dlc_name in dlc_present:
+                                self.progress.emit(f"Extracting {bsa_name}...")
+                                future = executor.submit(
+                                    extractor.extract, fo3_data / bsa_name, temp_dir / "dlc" / dlc_name
+                                )
+                                futures[future] = bsa_name
+                            for future in as_completed(futures):
+                                future.result()
+                                self.progress.emit(f"  Extracted {futures[future]}")
+                        queue_audio("dlc")
+
+                    # Copy music files
+                    if music_dir.exists():
+                        self.progress.emit("Copying music files...")
+                        music_output = temp_dir / "music"
+                        if music_output.exists():
+                            shutil.rmtree(music_output)
+                        shutil.copytree(music_dir, music_output, copy_function=link_or_copy)
+                        self.progress.emit("  Copied music files")
+                        queue_audio("music")
+                    else:
+                        self.progress.emit(f"Warning: Music folder not found at {music_dir}")
+
+                    # Staging folders left over from an earlier run still get packed
+                    with os.scandir(temp_dir) as entries:
+                        leftover = [
+                            entry.name for entry in entries
+                            if entry.is_dir(follow_symlinks=False) and entry.name not in scanned
+                        ]
+                    for folder_name in leftover:
+                        queue_audio(folder_name)
+
+                    # Convert MP3 files to xWMA (FO4 doesn't support MP3 in BA2)
+                    self.progress.emit("Converting MP3 files to xWMA...")
+                    if mp3_paths:
+                        converted_count = self._convert_mp3_files(mp3_paths)
+                        self.progress.emit(f"  Converted {converted_count} MP3 files to xWMA")
+                    else:
+                        self.progress.emit("  No MP3 files to convert")
+
+                    # Wait for the FUZ files still being processed
+                    self.progress.emit("Processing FUZ files...")
+                    processed = 0
+                    for future in as_completed(fuz_futures):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            self._queue_progress(
+                                f"  Warning: Could not process {fuz_futures[future].name}: {e}"
+                            )
+                    
+                        processed += 1
+                        if processed % FUZ_PROGRESS_INTERVAL == 0:
+                            self._queue_progress(f"  Processed {processed}/{len(fuz_futures)} FUZ files")
+                    self._flush_progress()
+                except BaseException:
+                    # Drop the queued FUZ files so the error isn't held up
+                    # behind them; only the ones already running finish
+                    fuz_executor.shutdown(cancel_futures=True)
+                    raise
 
             # Build BA2 using Archive2.exe
             self.progress.emit("Building BA2 archive...")
@@ -142,21 +346,18 @@ class ExtractWorker(QThread):
 
             # Cleanup temp directory
             self.progress.emit("Cleaning up...")
-            import shutil
             shutil.rmtree(temp_dir, ignore_errors=True)
 
             self.finished.emit(True, f"BA2 archive created successfully at:\n{final_dir}\n\nThis is a modder's resource - integrate into your own mods.")
 
         except Exception as e:
-            import traceback
+            self._flush_progress()
             self.progress.emit(f"Error: {traceback.format_exc()}")
             self.finished.emit(False, str(e))
 
     def _build_ba2_with_archive2(self, source_dir: Path, output_dir: Path):
         """Build BA2 archive using Archive2.exe."""
-        import subprocess
-
-        ba2_path = output_dir / "Fallout3Audio - Main.ba2"
+        ba2_path = output_dir / BA2_NAME
 
         # Archive2 command for uncompressed audio
         cmd = [
@@ -169,31 +370,52 @@ class ExtractWorker(QThread):
         ]
 
         self.progress.emit(f"  Running Archive2.exe (this may take 5-10 minutes for ~90k files)...")
-        
-        # Use Popen so we can show it's still running
+
+        # Merge stderr into stdout and read it line by line, so output
+        # shows up in the log while Archive2 runs
         process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
         )
         
+        # Only the end of the output is kept for error messages
+        tail: deque[str] = deque(maxlen=ARCHIVE2_OUTPUT_TAIL_LINES)
+
+        def pump_output():
+            for line in process.stdout:
+                line = line.rstrip()
+                if line:
+                    tail.append(line)
+                    self._queue_progress(f"    {line}")
+
+        reader = threading.Thread(target=pump_output, daemon=True)
+        reader.start()
+        
         # Wait with extended timeout (30 minutes for large archives)
         try:
-            stdout, stderr = process.communicate(timeout=1800)
+            process.wait(timeout=ARCHIVE2_TIMEOUT)
         except subprocess.TimeoutExpired:
             process.kill()
+            process.wait()
             raise RuntimeError("Archive2.exe timed out after 30 minutes")
+        finally:
+            reader.join()
+            process.stdout.close()
+            self._flush_progress()
 
         if process.returncode != 0:
+            output = "\n".join(tail)
             raise RuntimeError(
                 f"Archive2 failed (code {process.returncode}): "
-                f"{stderr or stdout}"
+                f"{output}"
             )
 
         self.progress.emit(f"  Created {ba2_path.name}")
 
-    def _convert_mp3_files(self, mp3_files: list) -> int:
+    def _convert_mp3_files(self, mp3_paths: list[str]) -> int:
         """Convert MP3 files to WAV format for FO4 compatibility.
         
         FO4's BA2 archives don't properly support MP3 files for music/radio.
@@ -204,33 +426,43 @@ class ExtractWorker(QThread):
         Returns:
             Number of files successfully converted
         """
-        import wave
-        import miniaudio
+        converted: list[str] = []
+        failures: list[str] = []
         
-        converted = 0
+        # miniaudio decodes in C without holding the GIL, so threads run the
+        # decodes in parallel. Each worker holds one decoded track in memory,
+        # so the pool is capped.
+        workers = min(MP3_DECODE_WORKERS, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_convert_one_mp3, mp3_path): mp3_path
+                for mp3_path in mp3_paths
+            }
+            for future in as_completed(futures):
+                error = future.exception()
+                if error is None:
+                    converted.append(futures[future])
+                else:
+                    failures.append(f"    {os.path.basename(futures[future])}: {error}")
         
-        for mp3_file in mp3_files:
+        # Remove the converted MP3s in one pass after all decodes finish,
+        # rather than interleaving deletes with the WAV writes
+        removed = 0
+        for mp3_path in converted:
             try:
-                # Decode MP3 to raw PCM using miniaudio
-                decoded = miniaudio.decode_file(str(mp3_file))
-                
-                # Convert to WAV
-                wav_file = mp3_file.with_suffix(".wav")
-                
-                with wave.open(str(wav_file), 'wb') as wav:
-                    wav.setnchannels(decoded.nchannels)
-                    wav.setsampwidth(2)  # 16-bit
-                    wav.setframerate(decoded.sample_rate)
-                    wav.writeframes(decoded.samples)
-                
-                # Remove original MP3
-                mp3_file.unlink()
-                converted += 1
-                
-            except Exception as e:
-                self.progress.emit(f"  Warning: Error converting {mp3_file.name}: {e}")
+                os.unlink(mp3_path)
+                removed += 1
+            except OSError as e:
+                failures.append(f"    {os.path.basename(mp3_path)}: {e}")
+        
+        # Report all failures in one message once the pool is done
+        if failures:
+            self.progress.emit(
+                f"  Warning: Could not convert {len(failures)} MP3 files:\n"
+                + "\n".join(sorted(failures))
+            )
         
-        return converted
+        return removed
 
 
 class MainWindow(QMainWindow):
@@ -329,17 +561,21 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.build_btn)
 
         # Progress/Log
-        self.log_output = QTextEdit()
+        self.log_output = QPlainTextEdit()
         self.log_output.setReadOnly(True)
+        self.log_output.setMaximumBlockCount(LOG_MAX_LINES)
+        self.log_output.setUndoRedoEnabled(False)
         self.log_output.setStyleSheet("font-family: Consolas, monospace;")
         layout.addWidget(self.log_output)
 
     def log(self, message: str):
         """Append message to log output."""
-        self.log_output.append(message)
-        # Auto-scroll to bottom
         scrollbar = self.log_output.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        at_bottom = scrollbar.value() == scrollbar.maximum()
+        self.log_output.appendPlainText(message)
+        # Only follow new output if the user hasn't scrolled up to read
+        if at_bottom:
+            self.log_output.moveCursor(QTextCursor.MoveOperation.End)
 
     def detect_archive2_path(self):
         """Try to auto-detect Fallout 4 and Archive2.exe paths.
@@ -444,20 +680,28 @@ class MainWindow(QMainWindow):
         found_dlc = []
         missing = []
 
+        # Read the directory once instead of stat-ing each expected name;
+        # names are compared lowercased as Windows does
+        try:
+            with os.scandir(data_path) as entries:
+                present = {entry.name.lower() for entry in entries}
+        except OSError:
+            present = set()
+
         # Check main game files
         for filename, desc in main_files:
-            if (data_path / filename).exists():
+            if filename.lower() in present:
                 found_main.append(desc)
             else:
                 missing.append(desc)
 
         # Check DLC files
         for filename, desc in dlc_files:
-            if (data_path / filename).exists():
+            if filename.lower() in present:
                 found_dlc.append(desc)
 
         # Check music folder
-        if (data_path / "Music").exists():
+        if "music" in present:
             found_main.append("Music folder")
         else:
             missing.append("Music folder")
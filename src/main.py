@@ -2,8 +2,12 @@
 
 import argparse
 import logging
+import os
+import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator
 
 # Handle imports for both source and frozen executable
 if getattr(sys, 'frozen', False):
@@ -12,12 +16,38 @@ if getattr(sys, 'frozen', False):
     from src.audio_converter import AudioConverter
     from src.fuz_processor import FUZProcessor
     from src.ba2_builder import BA2Builder, Archive2Builder
+    from src.file_utils import link_or_copy
 else:
     # Running from source
     from bsa_extractor import BSAExtractor
     from audio_converter import AudioConverter
     from fuz_processor import FUZProcessor
     from ba2_builder import BA2Builder, Archive2Builder
+    from file_utils import link_or_copy
+
+
+def _iter_files(root: Path) -> Iterator[Path]:
+    """
+    Yield every file under a directory, in the same order as rglob("*").
+
+    Uses os.scandir so file/directory checks come from the directory
+    listing instead of a stat per entry, and directories are never yielded.
+    Symlinked folders are not walked into, as with rglob, so a link cycle
+    can't loop forever.
+    """
+    stack = [str(root)]
+    while stack:
+        subdirs = []
+        files = []
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.is_file():
+                    files.append(entry.path)
+        yield from map(Path, files)
+        # Reversed so the first subdirectory is walked next, depth first
+        stack.extend(reversed(subdirs))
 
 
 def setup_logging(verbose: bool = False) -> None:
@@ -111,6 +141,11 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Convert audio files to xWMA (usually not needed - FO4 BA2 supports FO3 audio formats natively)",
     )
+    tool_group.add_argument(
+        "--keep-fuz",
+        action="store_true",
+        help="Pack FUZ files as-is instead of extracting their audio (FO4 uses the same FUZ format, lip sync included)",
+    )
     
     return parser.parse_args()
 
@@ -119,26 +154,34 @@ def find_fo3_bsas(fo3_data: Path) -> dict[str, Path | list[Path]]:
     """Find Fallout 3 BSA files in the Data folder, including DLC audio."""
     bsas: dict[str, Path | list[Path]] = {}
     
+    # List the folder once and test names against it instead of stat-ing
+    # every candidate; names are compared lowercased as Windows does
+    try:
+        with os.scandir(fo3_data) as entries:
+            present = {entry.name.lower() for entry in entries}
+    except OSError:
+        present = set()
+    
+    def exists(name: str) -> bool:
+        return name.lower() in present
+    
     # Main game sound BSA
     sound_names = ["Fallout - Sound.bsa", "Fallout3 - Sound.bsa"]
     for name in sound_names:
-        path = fo3_data / name
-        if path.exists():
-            bsas["sound"] = path
+        if exists(name):
+            bsas["sound"] = fo3_data / name
             break
     
     # Main game voices BSA
     voice_names = ["Fallout - Voices.bsa", "Fallout3 - Voices.bsa", "Fallout - Voices1.bsa"]
     for name in voice_names:
-        path = fo3_data / name
-        if path.exists():
-            bsas["voices"] = path
+        if exists(name):
+            bsas["voices"] = fo3_data / name
             break
     
     # Menu voices (optional)
-    menu_voices = fo3_data / "Fallout - MenuVoices.bsa"
-    if menu_voices.exists():
-        bsas["menu_voices"] = menu_voices
+    if exists("Fallout - MenuVoices.bsa"):
+        bsas["menu_voices"] = fo3_data / "Fallout - MenuVoices.bsa"
     
     # DLC sound BSAs - all files matching "* - Sounds.bsa" pattern
     dlc_sounds: list[Path] = []
@@ -150,17 +193,15 @@ def find_fo3_bsas(fo3_data: Path) -> dict[str, Path | list[Path]]:
         "Zeta - Sounds.bsa",
     ]
     for pattern in dlc_patterns:
-        path = fo3_data / pattern
-        if path.exists():
-            dlc_sounds.append(path)
+        if exists(pattern):
+            dlc_sounds.append(fo3_data / pattern)
     
     if dlc_sounds:
         bsas["dlc_sounds"] = dlc_sounds
     
     # Check for music folder
-    music_path = fo3_data / "Music"
-    if music_path.exists():
-        bsas["music"] = music_path
+    if exists("Music"):
+        bsas["music"] = fo3_data / "Music"
     
     return bsas
 
@@ -180,10 +221,10 @@ def find_archive2() -> Path | None:
     ]
     
     for fo4_path in fo4_paths:
-        if Path(fo4_path).exists():
-            archive2 = Path(fo4_path) / "Tools" / "Archive2" / "Archive2.exe"
-            if archive2.exists():
-                return archive2
+        # A missing install folder makes this check fail on its own
+        archive2 = Path(fo4_path) / "Tools" / "Archive2" / "Archive2.exe"
+        if archive2.exists():
+            return archive2
     
     return None
 
@@ -253,24 +294,19 @@ def main() -> None:
 
     # Step 1: Extract BSA files
     all_extracted_files: list[Path] = []
+    extract_jobs: list[tuple[Path, Path]] = []
     
     if "sound" in bsa_files:
         logger.info(f"Extracting sound BSA: {bsa_files['sound']}")
-        sound_dir = extracted_dir / "sound"
-        bsa_extractor.extract(bsa_files["sound"], sound_dir)
-        all_extracted_files.extend(sound_dir.rglob("*"))
+        extract_jobs.append((bsa_files["sound"], extracted_dir / "sound"))
     
     if "voices" in bsa_files:
         logger.info(f"Extracting voices BSA: {bsa_files['voices']}")
-        voices_dir = extracted_dir / "voices"
-        bsa_extractor.extract(bsa_files["voices"], voices_dir)
-        all_extracted_files.extend(voices_dir.rglob("*"))
+        extract_jobs.append((bsa_files["voices"], extracted_dir / "voices"))
     
     if "menu_voices" in bsa_files:
         logger.info(f"Extracting menu voices BSA: {bsa_files['menu_voices']}")
-        menu_dir = extracted_dir / "menu_voices"
-        bsa_extractor.extract(bsa_files["menu_voices"], menu_dir)
-        all_extracted_files.extend(menu_dir.rglob("*"))
+        extract_jobs.append((bsa_files["menu_voices"], extracted_dir / "menu_voices"))
     
     # Extract DLC sound BSAs
     if "dlc_sounds" in bsa_files:
@@ -279,9 +315,15 @@ def main() -> None:
             for dlc_bsa in dlc_list:
                 dlc_name = dlc_bsa.stem.replace(" - Sounds", "")
                 logger.info(f"Extracting DLC sound BSA: {dlc_bsa.name}")
-                dlc_dir = extracted_dir / "dlc" / dlc_name
-                bsa_extractor.extract(dlc_bsa, dlc_dir)
-                all_extracted_files.extend(dlc_dir.rglob("*"))
+                extract_jobs.append((dlc_bsa, extracted_dir / "dlc" / dlc_name))
+    
+    # Every archive extracts into its own folder, so they run side by side.
+    # The results are collected in the original order once all are done.
+    if extract_jobs:
+        with ThreadPoolExecutor(max_workers=len(extract_jobs)) as executor:
+            list(executor.map(lambda job: bsa_extractor.extract(*job), extract_jobs))
+        for _, dest_dir in extract_jobs:
+            all_extracted_files.extend(_iter_files(dest_dir))
     
     if "music" in bsa_files:
         music_source = bsa_files["music"]
@@ -290,20 +332,26 @@ def main() -> None:
         music_dest.mkdir(parents=True, exist_ok=True)
         
         # Copy music files (they're usually loose, not in BSA)
-        import shutil
         if music_source.is_dir():
-            for music_file in music_source.rglob("*"):
-                if music_file.is_file():
-                    rel_path = music_file.relative_to(music_source)
-                    dest_file = music_dest / rel_path
-                    dest_file.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(music_file, dest_file)
-                    all_extracted_files.append(dest_file)
+            music_files = list(_iter_files(music_source))
+            music_copies = [
+                music_dest / music_file.relative_to(music_source)
+                for music_file in music_files
+            ]
+            for parent in {dest_file.parent for dest_file in music_copies}:
+                parent.mkdir(parents=True, exist_ok=True)
+            
+            # Hard link each file, or copy it when the output is on another
+            # volume; the links and copies run side by side
+            workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(link_or_copy, music_files, music_copies))
+            all_extracted_files.extend(music_copies)
     
     # Handle pre-extracted input
     if args.input_dir:
         logger.info(f"Using pre-extracted files from: {args.input_dir}")
-        all_extracted_files.extend(args.input_dir.rglob("*"))
+        all_extracted_files.extend(_iter_files(args.input_dir))
 
     if not all_extracted_files:
         logger.error("No input files found. Provide --fo3-data, BSA paths, or --input-dir")
@@ -312,25 +360,48 @@ def main() -> None:
     # Step 2: Process FUZ files (extract audio from FUZ containers)
     logger.info("Processing FUZ files...")
     fuz_files = [f for f in all_extracted_files if f.suffix.lower() == ".fuz"]
-    audio_files: list[Path] = []
     
-    for fuz_file in fuz_files:
+    def extract_fuz(fuz_file: Path) -> Path | None:
         try:
-            audio_path = fuz_processor.extract_audio(
+            if args.keep_fuz:
+                # Link the container to where its audio would have been
+                # extracted, so it is packed under the same archive path
+                fuz_path = converted_dir / fuz_file.relative_to(extracted_dir)
+                fuz_path.parent.mkdir(parents=True, exist_ok=True)
+                link_or_copy(fuz_file, fuz_path)
+                return fuz_path
+            return fuz_processor.extract_audio(
                 fuz_file,
                 converted_dir / fuz_file.relative_to(extracted_dir).with_suffix(".xwm")
             )
-            audio_files.append(audio_path)
         except Exception as e:
             logger.warning(f"Failed to process FUZ: {fuz_file}: {e}")
+            return None
+    
+    # FUZ extraction is file I/O, so threads overlap it well
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        fuz_outputs = [
+            audio_path for audio_path in executor.map(extract_fuz, fuz_files)
+            if audio_path is not None
+        ]
+    
+    # Kept FUZ containers are packed as-is: the converters can't decode
+    # them, so they stay out of the conversion step
+    kept_fuz_files: list[Path] = []
+    audio_files: list[Path] = []
+    if args.keep_fuz:
+        kept_fuz_files = fuz_outputs
+    else:
+        audio_files = fuz_outputs
     
     # Add non-FUZ audio files
     audio_extensions = {".xwm", ".wav", ".mp3", ".ogg"}
     for f in all_extracted_files:
-        if f.is_file() and f.suffix.lower() in audio_extensions:
+        if f.suffix.lower() in audio_extensions:
             audio_files.append(f)
 
-    logger.info(f"Found {len(audio_files)} audio files to process")
+    logger.info(f"Found {len(kept_fuz_files) + len(audio_files)} audio files to process")
 
     # Step 3: Convert audio only if explicitly requested
     if args.convert:
@@ -343,6 +414,7 @@ def main() -> None:
     else:
         logger.info("Using original audio files (no conversion needed for FO4 BA2)")
         converted_files = audio_files
+    converted_files = kept_fuz_files + converted_files
 
     # Step 4: Build BA2 archive
     logger.info("Building BA2 archive...")
@@ -359,7 +431,9 @@ def main() -> None:
         staging_dir = output_dir / "staging"
         staging_dir.mkdir(parents=True, exist_ok=True)
         
-        import shutil
+        # Files that map to the same staging path keep the last one, as
+        # copying them in order did
+        staged: dict[Path, Path] = {}
         for audio_file in converted_files:
             # Determine archive path based on file type
             if "music" in str(audio_file).lower():
@@ -373,9 +447,16 @@ def main() -> None:
             else:
                 archive_path = Path("Sound/FX") / audio_file.name
             
-            dest_path = staging_dir / archive_path
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(audio_file, dest_path)
+            staged[staging_dir / archive_path] = audio_file
+        
+        for parent in {dest_path.parent for dest_path in staged}:
+            parent.mkdir(parents=True, exist_ok=True)
+        
+        # Staging only feeds Archive2, so a link avoids a second copy of
+        # every file. Links and copies are I/O-bound, so threads overlap them.
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(link_or_copy, staged.values(), staged.keys()))
         
         # Build with Archive2
         archive2_builder = Archive2Builder(archive2_path)
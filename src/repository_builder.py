@@ -1,14 +1,198 @@
 """Repository builder for organizing Fallout 4 audio files."""
 
+import ctypes
 import json
 import logging
+import os
+import re
 import shutil
+import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Any, Optional
 
+try:
+    import orjson  # Optional: much faster JSON encoder than stdlib json
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Common Fallout 3 voice types
+VOICE_TYPES = (
+    "MaleAdult01",
+    "MaleAdult02",
+    "MaleAdult03",
+    "MaleAdult04",
+    "MaleAdult05",
+    "MaleChild01",
+    "MaleOld01",
+    "MaleOld02",
+    "FemaleAdult01",
+    "FemaleAdult02",
+    "FemaleAdult03",
+    "FemaleAdult04",
+    "FemaleAdult05",
+    "FemaleChild01",
+    "FemaleOld01",
+    "FemaleOld02",
+    "RobotMrHandy",
+    "RobotProtectron",
+    "SuperMutant01",
+    "Ghoul01",
+)
+
+# Finds the leftmost voice type in a path in one case-insensitive scan
+_VOICE_TYPE_RE = re.compile("|".join(map(re.escape, VOICE_TYPES)), re.IGNORECASE)
+
+# Lowercased voice type -> canonical spelling
+_VOICE_TYPE_NAMES = {voice_type.lower(): voice_type for voice_type in VOICE_TYPES}
+
+# os.sendfile can copy between regular files only on Linux
+_USE_SENDFILE = sys.platform.startswith("linux")
+
+# CopyFileW with declared argument types; use_last_error keeps the error
+# code from the call itself, before anything else can overwrite it
+if sys.platform == "win32":
+    from ctypes import wintypes
+
+    _CopyFileW = ctypes.WinDLL("kernel32", use_last_error=True).CopyFileW
+    _CopyFileW.argtypes = (wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.BOOL)
+    _CopyFileW.restype = wintypes.BOOL
+
+# FOMOD installer files; plain ASCII, so kept as bytes and written as-is
+_FOMOD_INFO_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<fomod>
+    <Name>Fallout 3 Audio for Fallout 4</Name>
+    <Author>FO3 Audio Repository Builder</Author>
+    <Version>1.0.0</Version>
+    <Description>Audio files from Fallout 3, converted for use in Fallout 4.</Description>
+    <Website></Website>
+</fomod>
+"""
+
+_FOMOD_MODULE_CONFIG_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<config xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+        xsi:noNamespaceSchemaLocation="http://qconsulting.ca/fo3/ModConfig5.0.xsd">
+    <moduleName>Fallout 3 Audio for Fallout 4</moduleName>
+    <installSteps order="Explicit">
+        <installStep name="Install">
+            <optionalFileGroups order="Explicit">
+                <group name="Audio Files" type="SelectExactlyOne">
+                    <plugins order="Explicit">
+                        <plugin name="Install All Audio">
+                            <description>Installs all Fallout 3 audio files.</description>
+                            <files>
+                                <folder source="Sound" destination="Sound" priority="0"/>
+                            </files>
+                            <typeDescriptor>
+                                <type name="Recommended"/>
+                            </typeDescriptor>
+                        </plugin>
+                    </plugins>
+                </group>
+            </optionalFileGroups>
+        </installStep>
+    </installSteps>
+</config>
+"""
+
+
+def _json_bytes(value: Any) -> bytes:
+    """
+    Encode a value as compact JSON, with orjson when it is installed.
+
+    The fallback uses the same separators and leaves non-ASCII text
+    unescaped, as orjson does, so the output doesn't depend on which
+    encoder ran.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+@lru_cache(maxsize=4096)
+def _voice_type_for_dir(folder: str) -> Optional[str]:
+    """
+    Voice type named by a folder path, or None if it names none.
+
+    A build has a few dozen voice folders holding thousands of files
+    each, so nearly every lookup is a cache hit.
+    """
+    # Voice files sit directly in a folder named after their voice type
+    # (Sound/Voice/<plugin>/<VoiceType>/...), so try that name first
+    voice_type = _VOICE_TYPE_NAMES.get(os.path.basename(folder).lower())
+    if voice_type:
+        return voice_type
+
+    # Otherwise find the first voice type named anywhere in the path
+    match = _VOICE_TYPE_RE.search(folder)
+    return _VOICE_TYPE_NAMES[match.group(0).lower()] if match else None
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """
+    Copy a file's data using the platform's native copy.
+
+    On Windows this is CopyFileW and on Linux a direct os.sendfile loop,
+    both of which copy inside the kernel. Elsewhere shutil.copyfile picks
+    the best path it has. Repository files are derived assets, so
+    permissions, timestamps and extended attributes are not carried over
+    beyond what CopyFileW does on its own.
+    """
+    if sys.platform == "win32":
+        if not _CopyFileW(str(src), str(dst), False):
+            raise ctypes.WinError(ctypes.get_last_error())
+        return
+
+    if not _USE_SENDFILE:
+        shutil.copyfile(src, dst)
+        return
+
+    with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        if size:
+            # Reserve the whole file up front so it is laid out contiguously
+            try:
+                os.posix_fallocate(fdst.fileno(), 0, size)
+            except OSError:
+                # Not every file system supports it; the copy works without
+                pass
+
+        sent = 0
+        while sent < size:
+            count = os.sendfile(fdst.fileno(), fsrc.fileno(), sent, size - sent)
+            if count == 0:
+                raise OSError(f"Unexpected end of file: {src}")
+            sent += count
+
+
+def _materialize(src: Path, dst: Path, link: bool) -> None:
+    """
+    Place a file in the repository as a hard link if allowed, else a copy.
+
+    An existing destination is removed first rather than written over,
+    since it may be a link left by an earlier build and writing through it
+    would change that build's source file.
+    """
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
+
+    if link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            # Different volume, or a file system without hard links
+            pass
+
+    _fast_copy(src, dst)
+
 
 @dataclass
 class AudioFile:
@@ -37,15 +221,18 @@ class RepositoryBuilder:
     # Fallout 4 audio directory structure
     FO4_SOUND_PATH = Path("Sound/Voice")
 
-    def __init__(self, output_dir: Path) -> None:
+    def __init__(self, output_dir: Path, parallel: bool = True) -> None:
         """
         Initialize the repository builder.
 
         Args:
             output_dir: Base directory for the repository
+            parallel: Copy files on a thread pool (disable to debug copies
+                      one at a time)
         """
         self.logger = logging.getLogger(__name__)
         self.output_dir = output_dir
+        self.parallel = parallel
         self.repository = Repository(
             name="FO3 Audio Repository",
             version="1.0.0",
@@ -55,6 +242,7 @@ class RepositoryBuilder:
         self,
         audio_files: list[Path],
         plugin_name: str = "Fallout3Audio.esp",
+        link_if_possible: bool = False,
     ) -> Path:
         """
         Build the audio repository from converted files.
@@ -62,6 +250,10 @@ class RepositoryBuilder:
         Args:
             audio_files: List of converted audio file paths
             plugin_name: Name of the target ESP/ESM plugin
+            link_if_possible: Hard link files into the repository when they
+                              are on the same volume instead of copying them.
+                              Linked files share their data with the source,
+                              so editing either one changes both.
 
         Returns:
             Path to the built repository
@@ -77,23 +269,43 @@ class RepositoryBuilder:
         # Organize files by voice type
         organized_files = self._organize_by_voice_type(audio_files)
 
-        # Copy files to repository
+        # Plan the copies and create every folder before copying. Files
+        # that share a destination keep the last one, as copying in order did.
+        copies: dict[Path, Path] = {}
+        entries: list[AudioFile] = []
         for voice_type, files in organized_files.items():
             voice_type_dir = voice_dir / voice_type
             voice_type_dir.mkdir(parents=True, exist_ok=True)
 
+            # Repository-relative folder, built once rather than deriving
+            # each file's relative path with relative_to()
+            relative_dir = self.FO4_SOUND_PATH / plugin_name / voice_type
+
             for audio_file in files:
                 dest_path = voice_type_dir / audio_file.name
-                shutil.copy2(audio_file, dest_path)
+                copies[dest_path] = audio_file
 
-                self.repository.files.append(
+                entries.append(
                     AudioFile(
-                        path=dest_path.relative_to(repo_dir),
+                        path=relative_dir / audio_file.name,
                         original_path=audio_file,
                         voice_type=voice_type,
                     )
                 )
 
+        # Link or copy files into the repository; both are I/O-bound, so
+        # threads overlap them
+        place = partial(_materialize, link=link_if_possible)
+        if self.parallel:
+            workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(place, copies.values(), copies.keys()))
+        else:
+            for dest_path, audio_file in copies.items():
+                place(audio_file, dest_path)
+
+        self.repository.files.extend(entries)
+
         # Generate metadata
         self._generate_metadata(repo_dir)
 
@@ -116,19 +328,14 @@ class RepositoryBuilder:
         Returns:
             Dictionary mapping voice type to list of files
         """
-        organized: dict[str, list[Path]] = {}
+        organized: defaultdict[str, list[Path]] = defaultdict(list)
 
         for audio_file in audio_files:
             # Try to extract voice type from path
-            voice_type = self._detect_voice_type(audio_file)
-
-            if voice_type not in organized:
-                organized[voice_type] = []
-
-            organized[voice_type].append(audio_file)
+            organized[self._detect_voice_type(audio_file)].append(audio_file)
 
         self.logger.debug(f"Organized into {len(organized)} voice types")
-        return organized
+        return dict(organized)
 
     def _detect_voice_type(self, audio_path: Path) -> str:
         """
@@ -140,35 +347,14 @@ class RepositoryBuilder:
         Returns:
             Voice type string
         """
-        # Common Fallout 3 voice types
-        voice_types = [
-            "MaleAdult01",
-            "MaleAdult02",
-            "MaleAdult03",
-            "MaleAdult04",
-            "MaleAdult05",
-            "MaleChild01",
-            "MaleOld01",
-            "MaleOld02",
-            "FemaleAdult01",
-            "FemaleAdult02",
-            "FemaleAdult03",
-            "FemaleAdult04",
-            "FemaleAdult05",
-            "FemaleChild01",
-            "FemaleOld01",
-            "FemaleOld02",
-            "RobotMrHandy",
-            "RobotProtectron",
-            "SuperMutant01",
-            "Ghoul01",
-        ]
-
-        # Check if any voice type is in the path
-        path_str = str(audio_path).lower()
-        for voice_type in voice_types:
-            if voice_type.lower() in path_str:
-                return voice_type
+        voice_type = _voice_type_for_dir(str(audio_path.parent))
+        if voice_type:
+            return voice_type
+
+        # The folders name no voice type; the file name still might
+        match = _VOICE_TYPE_RE.search(audio_path.name)
+        if match:
+            return _VOICE_TYPE_NAMES[match.group(0).lower()]
 
         # Default to generic
         return "Generic"
@@ -177,32 +363,62 @@ class RepositoryBuilder:
         """
         Generate repository metadata file.
 
+        The file list is streamed to disk one entry per line instead of
+        being built as a list of dicts first, so memory use does not grow
+        with the repository. Entries are encoded with orjson when the
+        optional package is installed, otherwise with stdlib json.
+
         Args:
             repo_dir: Repository directory
         """
-        metadata: dict[str, Any] = {
+        header: dict[str, Any] = {
             "name": self.repository.name,
             "version": self.repository.version,
             "file_count": len(self.repository.files),
             "voice_types": list(
                 set(f.voice_type for f in self.repository.files if f.voice_type)
             ),
-            "files": [
-                {
-                    "path": str(f.path),
-                    "voice_type": f.voice_type,
-                    "form_id": f.form_id,
-                }
-                for f in self.repository.files
-            ],
         }
 
         metadata_path = repo_dir / "repository.json"
-        with open(metadata_path, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2)
+
+        # Write beside the real file and swap it in at the end, so a failed
+        # build never leaves a truncated repository.json behind
+        temp_path = metadata_path.with_suffix(".json.tmp")
+        try:
+            self._write_metadata(temp_path, header)
+            os.replace(temp_path, metadata_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
 
         self.logger.info(f"Generated metadata: {metadata_path}")
 
+    def _write_metadata(self, path: Path, header: dict[str, Any]) -> None:
+        """
+        Stream the metadata document to a file.
+
+        Args:
+            path: File to write
+            header: Top-level fields written before the file list
+        """
+        with open(path, "wb") as out:
+            out.write(b"{\n")
+            for key, value in header.items():
+                out.write(b'  "%s": %s,\n' % (key.encode("ascii"), _json_bytes(value)))
+
+            out.write(b'  "files": [')
+            separator = b"\n    "
+            for f in self.repository.files:
+                out.write(separator)
+                out.write(_json_bytes({
+                    "path": str(f.path),
+                    "voice_type": f.voice_type,
+                    "form_id": f.form_id,
+                }))
+                separator = b",\n    "
+            out.write(b"\n  ]\n}\n")
+
     def create_fomod_installer(self, repo_dir: Path) -> Path:
         """
         Create a FOMOD installer for the audio repository.
@@ -216,45 +432,8 @@ class RepositoryBuilder:
         fomod_dir = repo_dir / "fomod"
         fomod_dir.mkdir(parents=True, exist_ok=True)
 
-        # Create info.xml
-        info_xml = """<?xml version="1.0" encoding="UTF-8"?>
-<fomod>
-    <Name>Fallout 3 Audio for Fallout 4</Name>
-    <Author>FO3 Audio Repository Builder</Author>
-    <Version>1.0.0</Version>
-    <Description>Audio files from Fallout 3, converted for use in Fallout 4.</Description>
-    <Website></Website>
-</fomod>
-"""
-        (fomod_dir / "info.xml").write_text(info_xml, encoding="utf-8")
-
-        # Create ModuleConfig.xml
-        module_config = """<?xml version="1.0" encoding="UTF-8"?>
-<config xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
-        xsi:noNamespaceSchemaLocation="http://qconsulting.ca/fo3/ModConfig5.0.xsd">
-    <moduleName>Fallout 3 Audio for Fallout 4</moduleName>
-    <installSteps order="Explicit">
-        <installStep name="Install">
-            <optionalFileGroups order="Explicit">
-                <group name="Audio Files" type="SelectExactlyOne">
-                    <plugins order="Explicit">
-                        <plugin name="Install All Audio">
-                            <description>Installs all Fallout 3 audio files.</description>
-                            <files>
-                                <folder source="Sound" destination="Sound" priority="0"/>
-                            </files>
-                            <typeDescriptor>
-                                <type name="Recommended"/>
-                            </typeDescriptor>
-                        </plugin>
-                    </plugins>
-                </group>
-            </optionalFileGroups>
-        </installStep>
-    </installSteps>
-</config>
-"""
-        (fomod_dir / "ModuleConfig.xml").write_text(module_config, encoding="utf-8")
+        (fomod_dir / "info.xml").write_bytes(_FOMOD_INFO_XML)
+        (fomod_dir / "ModuleConfig.xml").write_bytes(_FOMOD_MODULE_CONFIG_XML)
 
         self.logger.info(f"Created FOMOD installer: {fomod_dir}")
         return fomod_dir
@@ -283,11 +462,34 @@ class RepositoryBuilder:
         if not sound_dir.exists():
             issues.append("Missing Sound directory")
 
-        # Validate audio files
-        audio_files = list(repo_dir.rglob("*.xwm")) + list(repo_dir.rglob("*.fuz"))
-        for audio_file in audio_files:
-            if audio_file.stat().st_size == 0:
-                issues.append(f"Empty file: {audio_file}")
+        # Validate audio files in a single walk, reporting .xwm files first
+        # and then .fuz files as the two separate globs did. Sizes come from
+        # the directory entries, which Windows fills in while listing.
+        empty: dict[str, list[str]] = {".xwm": [], ".fuz": []}
+        pending = [str(repo_dir)]
+        while pending:
+            subdirs = []
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                # Missing or unreadable folder; skipped as os.walk would
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    suffix = os.path.splitext(entry.name)[1].lower()
+                    if (
+                        suffix in empty
+                        and entry.is_file(follow_symlinks=False)
+                        and entry.stat(follow_symlinks=False).st_size == 0
+                    ):
+                        empty[suffix].append(entry.path)
+            # Reversed so folders are visited in listing order, depth first
+            pending.extend(reversed(subdirs))
+        for file_path in empty[".xwm"] + empty[".fuz"]:
+            issues.append(f"Empty file: {file_path}")
 
         if issues:
             for issue in issues:
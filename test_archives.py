@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Regression checks for the BSA and BA2 readers and writers.
+
+Builds small archives in a temp folder, so no game install is needed.
+Exits non-zero on the first failure.
+"""
+
+import struct
+import sys
+import tempfile
+import zlib
+from pathlib import Path, PureWindowsPath
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from bsa_extractor import BSAExtractor, _PathFilter
+from ba2_builder import BA2Builder, BA2Reader
+
+# BSA header: magic, version, folder records offset, flags, folder count,
+# file count, total folder name length, total file name length, file flags
+_BSA_HEADER = struct.Struct("<4sIIIIIIII")
+
+# BSA folder and file records: name hash, count or size, offset
+_BSA_RECORD = struct.Struct("<QII")
+
+# Archive flags: folder names, file names, compressed by default, embedded names
+_BSA_FLAGS = 0x1 | 0x2
+_BSA_COMPRESSED = 0x4
+_BSA_EMBEDDED_NAMES = 0x100
+
+# Set in a file record's size to flip the archive's compression default
+_BSA_TOGGLE_COMPRESSION = 0x40000000
+
+SAMPLE_FILES = {
+    "sound\\fx\\wpn\\laser_fire.wav": b"RIFF" + bytes(range(256)) * 40,
+    "sound\\fx\\amb\\wind.xwm": b"XWMA" * 3000,
+    "sound\\voice\\fallout3.esm\\maleadult01\\hello_0001234a_1.fuz": b"FUZE" + b"\x01" * 500,
+    "sound\\voice\\fallout3.esm\\femaleadult01\\hello_0001234a_1.fuz": b"FUZE" + b"\x02" * 500,
+    "music\\battle\\mus_battle_\xe9.mp3": b"\xff\xfb" + b"\x00" * 700,
+    "sound\\empty.lip": b"",
+}
+
+FILTER_PATTERNS = [
+    "*.wav", "*.FUZ", "*.mp3", "fx\\*\\*", "wpn\\*", "voice\\*\\*\\*.fuz",
+    "sound\\*", "sound\\fx\\wpn\\laser_fire.wav", "maleadult0?\\*",
+    "[fm]*adult01\\*", "*", "*\\*\\*\\*\\*", "C:\\sound\\*", "\\sound\\*",
+]
+
+
+def make_bsa(
+    path: Path,
+    files: dict[str, bytes],
+    compressed: bool = False,
+    embedded_names: bool = False,
+    toggled: frozenset[str] = frozenset(),
+) -> None:
+    """Write a version 104 BSA holding the given files."""
+    folders: dict[str, list[tuple[str, bytes]]] = {}
+    for full_path, data in files.items():
+        folder, _, name = full_path.rpartition("\\")
+        folders.setdefault(folder, []).append((name, data))
+
+    flags = _BSA_FLAGS
+    if compressed:
+        flags |= _BSA_COMPRESSED
+    if embedded_names:
+        flags |= _BSA_EMBEDDED_NAMES
+
+    folder_names = [name.encode("cp1252") for name in folders]
+    file_names = [
+        name.encode("cp1252") for entries in folders.values() for name, _ in entries
+    ]
+    data_start = (
+        _BSA_HEADER.size
+        + _BSA_RECORD.size * len(folders)
+        + sum(2 + len(name) + _BSA_RECORD.size * len(entries)
+              for name, entries in zip(folder_names, folders.values()))
+        + sum(len(name) + 1 for name in file_names)
+    )
+
+    blobs: list[bytes] = []
+    file_records: list[list[tuple[int, int]]] = []
+    offset = data_start
+    for folder, entries in folders.items():
+        records = []
+        for name, data in entries:
+            full_path = f"{folder}\\{name}"
+            is_toggled = full_path in toggled
+            body = b""
+            if embedded_names:
+                encoded = full_path.encode("cp1252")
+                body += bytes([len(encoded)]) + encoded
+            if compressed != is_toggled:
+                body += struct.pack("<I", len(data)) + zlib.compress(data)
+            else:
+                body += data
+            size = len(body) | (_BSA_TOGGLE_COMPRESSION if is_toggled else 0)
+            records.append((size, offset))
+            blobs.append(body)
+            offset += len(body)
+        file_records.append(records)
+
+    out = bytearray(_BSA_HEADER.pack(
+        b"BSA\x00", 104, _BSA_HEADER.size, flags, len(folders), len(file_names),
+        sum(len(name) + 1 for name in folder_names),
+        sum(len(name) + 1 for name in file_names), 0,
+    ))
+    for i, entries in enumerate(folders.values()):
+        out += _BSA_RECORD.pack(i, len(entries), 0)
+    for name, records in zip(folder_names, file_records):
+        out += bytes([len(name) + 1]) + name + b"\x00"
+        for j, (size, file_offset) in enumerate(records):
+            out += _BSA_RECORD.pack(j, size, file_offset)
+    for name in file_names:
+        out += name + b"\x00"
+    out += b"".join(blobs)
+    path.write_bytes(out)
+
+
+def check_path_filter() -> None:
+    """_PathFilter must agree with PureWindowsPath.match."""
+    for pattern in FILTER_PATTERNS:
+        path_filter = _PathFilter(pattern)
+        for full_path in SAMPLE_FILES:
+            expected = PureWindowsPath(full_path).match(pattern)
+            folder, _, name = full_path.rpartition("\\")
+            assert path_filter.matches(full_path) == expected, (pattern, full_path)
+            assert path_filter.matches_file(folder, name) == expected, (pattern, full_path)
+            # Archive paths come in mixed case
+            upper = full_path.upper()
+            assert path_filter.matches(upper) == PureWindowsPath(upper).match(pattern), (
+                pattern, upper
+            )
+    print(f"  ✓ _PathFilter matches PureWindowsPath.match for {len(FILTER_PATTERNS)} patterns")
+
+
+def check_bsa_round_trip(work_dir: Path) -> None:
+    """Extract mock BSAs in every storage layout and compare the files."""
+    extractor = BSAExtractor()
+    layouts = {
+        "stored": {},
+        "compressed": {"compressed": True},
+        "embedded": {"embedded_names": True},
+        "toggled": {
+            "compressed": True,
+            "embedded_names": True,
+            "toggled": frozenset(list(SAMPLE_FILES)[::2]),
+        },
+    }
+    for layout, options in layouts.items():
+        bsa_path = work_dir / f"{layout}.bsa"
+        make_bsa(bsa_path, SAMPLE_FILES, **options)
+
+        output_dir = work_dir / f"{layout}_out"
+        extractor.extract(bsa_path, output_dir)
+        for full_path, data in SAMPLE_FILES.items():
+            extracted = output_dir / full_path.replace("\\", "/")
+            assert extracted.read_bytes() == data, (layout, full_path)
+
+        # A filtered extraction writes exactly the files the filter matches
+        filtered_dir = work_dir / f"{layout}_fuz"
+        extractor.extract(bsa_path, filtered_dir, "*.fuz")
+        written = {
+            str(p.relative_to(filtered_dir)).replace("/", "\\")
+            for p in filtered_dir.rglob("*") if p.is_file()
+        }
+        expected = {p for p in SAMPLE_FILES if PureWindowsPath(p).match("*.fuz")}
+        assert written == expected, (layout, written)
+    print(f"  ✓ BSA round trip: {len(layouts)} layouts, {len(SAMPLE_FILES)} files each")
+
+
+def check_truncated_bsa(work_dir: Path) -> None:
+    """A BSA cut short loses the damaged entry, not the whole extraction."""
+    bsa_path = work_dir / "truncated.bsa"
+    make_bsa(bsa_path, SAMPLE_FILES)
+    bsa_path.write_bytes(bsa_path.read_bytes()[:-100])
+
+    output_dir = work_dir / "truncated_out"
+    BSAExtractor().extract(bsa_path, output_dir)
+    intact = [p for p in SAMPLE_FILES if not p.endswith(".mp3")]
+    for full_path in intact:
+        extracted = output_dir / full_path.replace("\\", "/")
+        assert extracted.read_bytes() == SAMPLE_FILES[full_path], full_path
+    print(f"  ✓ Truncated BSA: {len(intact)} intact files still extracted")
+
+
+def check_ba2_round_trip(work_dir: Path) -> None:
+    """Pack files into a BA2, read it back and compare."""
+    source_dir = work_dir / "ba2_source"
+    for compress in (False, True):
+        builder = BA2Builder(compress=compress)
+        for full_path, data in SAMPLE_FILES.items():
+            source = source_dir / full_path.replace("\\", "/")
+            source.parent.mkdir(parents=True, exist_ok=True)
+            source.write_bytes(data)
+            builder.add_file(source, full_path.replace("\\", "/"))
+
+        ba2_path = work_dir / f"round_trip_{compress}.ba2"
+        builder.build(ba2_path)
+
+        reader = BA2Reader(ba2_path)
+        assert sorted(reader.list_files()) == sorted(p.lower() for p in SAMPLE_FILES)
+
+        output_dir = work_dir / f"ba2_out_{compress}"
+        assert reader.extract(output_dir) == len(SAMPLE_FILES)
+        for full_path, data in SAMPLE_FILES.items():
+            record = reader.files[full_path.lower()]
+            assert (output_dir / record.path).read_bytes() == data, (compress, full_path)
+    print("  ✓ BA2 round trip: stored and compressed")
+
+
+def main() -> None:
+    print("Archive regression checks")
+    with tempfile.TemporaryDirectory() as temp:
+        work_dir = Path(temp)
+        check_path_filter()
+        check_bsa_round_trip(work_dir)
+        check_truncated_bsa(work_dir)
+        check_ba2_round_trip(work_dir)
+    print("All archive checks passed")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"\n❌ ERROR: {e!r}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
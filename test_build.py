@@ -16,15 +16,18 @@ from bsa_extractor import BSAExtractor
 from fuz_processor import FUZProcessor
 from ba2_builder import BA2Builder
 
+# FUZ header: magic, version, lip data size
+_FUZ_HEADER = struct.Struct("<4sII")
+
+# Leading BA2 header fields: magic, version, archive type, file count
+_BA2_HEADER_START = struct.Struct("<4sIII")
+
 
 def create_mock_fuz(output_path: Path, audio_data: bytes = b"MOCK_AUDIO" * 50):
     """Create a mock FUZ file for testing."""
-    magic = b"FUZE"
-    version = struct.pack("<I", 1)
-    lip_size = struct.pack("<I", 16)
     lip_data = b"\x00" * 16
     
-    fuz_data = magic + version + lip_size + lip_data + audio_data
+    fuz_data = _FUZ_HEADER.pack(b"FUZE", 1, len(lip_data)) + lip_data + audio_data
     output_path.parent.mkdir(parents=True, exist_ok=True)
     output_path.write_bytes(fuz_data)
     return output_path
@@ -146,10 +149,9 @@ def main():
     
     # Verify BA2 structure
     with open(ba2_output, "rb") as f:
-        magic = f.read(4)
-        version = struct.unpack("<I", f.read(4))[0]
-        archive_type = struct.unpack("<I", f.read(4))[0]
-        file_count_ba2 = struct.unpack("<I", f.read(4))[0]
+        magic, version, archive_type, file_count_ba2 = _BA2_HEADER_START.unpack(
+            f.read(_BA2_HEADER_START.size)
+        )
     
     print("BA2 Archive Info:")
     print(f"  Magic: {magic}")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Regression checks for the command line build.
+
+Runs src/main.py against a mock Fallout 3 Data folder in a temp folder and
+inspects the BA2 it writes. Exits non-zero on the first failure.
+"""
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from ba2_builder import BA2Reader
+from test_archives import make_bsa
+
+MAIN_SCRIPT = Path(__file__).parent / "src" / "main.py"
+
+VOICE_FILES = {
+    "sound\\voice\\fallout3.esm\\maleadult01\\hello_0001234a_1.fuz": (
+        b"FUZE" + b"\x01\x00\x00\x00" + b"\x04\x00\x00\x00" + b"LIPS" + b"\x11" * 300
+    ),
+    "sound\\voice\\fallout3.esm\\femaleadult01\\bye_0001234b_1.fuz": (
+        b"FUZE" + b"\x01\x00\x00\x00" + b"\x04\x00\x00\x00" + b"LIPS" + b"\x22" * 300
+    ),
+}
+
+
+def run_build(work_dir: Path, *options: str) -> BA2Reader:
+    """Build from the mock Data folder and return a reader for the BA2."""
+    fo3_data = work_dir / "Data"
+    fo3_data.mkdir(exist_ok=True)
+    make_bsa(fo3_data / "Fallout - Voices.bsa", VOICE_FILES)
+    output_dir = work_dir / "output"
+
+    # No tools folder, so --convert runs without ffmpeg or xWMAEncode
+    result = subprocess.run(
+        [
+            sys.executable, str(MAIN_SCRIPT),
+            "--fo3-data", str(fo3_data),
+            "--output-dir", str(output_dir),
+            "--tools-dir", str(work_dir / "no_tools"),
+            *options,
+        ],
+        cwd=work_dir,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    return BA2Reader(output_dir / "final" / "Fallout3Audio" / "Fallout3Audio - Main.ba2")
+
+
+def check_keep_fuz_with_convert(work_dir: Path) -> None:
+    """--keep-fuz containers skip --convert and are packed unchanged."""
+    reader = run_build(work_dir, "--keep-fuz", "--convert")
+
+    packed = {
+        path.rpartition("\\")[2]: path
+        for path in reader.list_files() if path.endswith(".fuz")
+    }
+    expected = {full_path.rpartition("\\")[2]: data for full_path, data in VOICE_FILES.items()}
+    assert sorted(packed) == sorted(expected), sorted(packed)
+
+    output_dir = work_dir / "ba2_out"
+    reader.extract(output_dir)
+    for name, path in packed.items():
+        assert (output_dir / reader.files[path].path).read_bytes() == expected[name], name
+    print(f"  ✓ --keep-fuz --convert packs all {len(expected)} FUZ files unchanged")
+
+
+def main() -> None:
+    print("CLI regression checks")
+    with tempfile.TemporaryDirectory() as temp:
+        check_keep_fuz_with_convert(Path(temp))
+    print("All CLI checks passed")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"\n❌ ERROR: {e!r}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)